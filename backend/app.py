@@ -4,6 +4,9 @@
 # 1. Pustaka Standar Python
 # ==============================================================================
 import os
+import time
+
+_app_start = time.perf_counter()
 
 # ==============================================================================
 # 2. Pustaka Pihak Ketiga (Third-Party)
@@ -16,19 +19,27 @@ from flask_sqlalchemy import SQLAlchemy
 # 3. Impor Lokal Aplikasi Anda
 # ==============================================================================
 from config import Config
-from models import db
+from models import db, PpnMasukan, PpnKeluaran
 from bukti_setor.utils import allowed_file
 from faktur.services import (
     process_invoice_file,
+    submit_invoice_job,
+    process_invoice_batch,
     save_invoice_data,
+    save_invoice_batch,
     generate_excel_export,
     get_history,
 )
-from faktur.services.delete import delete_faktur
+from faktur.services.delete import delete_faktur, delete_faktur_batch
 from bukti_setor.services.delete import delete_bukti_setor
+from shared_utils.job_queue import init_job_queue, get_job_queue
+from bukti_setor.utils.ocr_engine import STARTUP_REPORT as EASYOCR_REPORT
 
 from bukti_setor.routes import bukti_setor_bp
 from bukti_setor.routes import laporan_bp  # pastikan ini diimpor untuk digunakan
+from laporan.routes import ringkasan_bp
+from shared_utils.response_cache import respon_cache, naikkan_versi
+from impor.routes import impor_bp
 
 # ==============================================================================
 # INISIALISASI FLASK APP
@@ -47,17 +58,46 @@ CORS(app, origins=[
 db.init_app(app)
 app.register_blueprint(bukti_setor_bp)
 app.register_blueprint(laporan_bp)
+app.register_blueprint(ringkasan_bp)
+app.register_blueprint(impor_bp)
 from flask_migrate import Migrate  # ⬅️ import ini di bagian atas
 migrate = Migrate(app, db)        # ⬅️ ini setelah db.init_app(app)
+init_job_queue(app)
+
+# Waktu dari import pertama sampai app siap (EasyOCR tidak termasuk, dimuat lazy)
+STARTUP_SECONDS = round(time.perf_counter() - _app_start, 3)
+print(f"[🚀 STARTUP] App Flask siap dalam {STARTUP_SECONDS} s")
 
 # ==============================================================================
 # ROUTES
 # ==============================================================================
 
+# Tabel yang versinya menentukan cache /api/history (dinaikkan setiap save/delete faktur)
+TABEL_FAKTUR = (PpnMasukan.__tablename__, PpnKeluaran.__tablename__)
+
+@app.route("/api/health", methods=["GET"])
+def health():
+    return jsonify(status="ok", startup_seconds=STARTUP_SECONDS, easyocr=EASYOCR_REPORT), 200
+
 @app.route("/api/process", methods=["POST"])
 def process_file():
     return process_invoice_file(request, app.config)
 
+@app.route("/api/process/jobs", methods=["POST"])
+def submit_process_job():
+    return submit_invoice_job(request, app.config)
+
+@app.route("/api/process/batch", methods=["POST"])
+def process_batch():
+    return process_invoice_batch(request, app.config)
+
+@app.route("/api/jobs/<string:job_id>", methods=["GET"])
+def get_job_status(job_id):
+    job = get_job_queue().get(job_id)
+    if not job:
+        return jsonify(error="Job tidak ditemukan atau sudah kedaluwarsa"), 404
+    return jsonify(job), 200
+
 @app.route("/api/save", methods=["POST"])
 def save_data():
     if not request.is_json:
@@ -67,16 +107,23 @@ def save_data():
 
     try:
         if isinstance(data, list):
-            saved_count = 0
-            for item in data:
-                save_invoice_data(item, db)
-                saved_count += 1
+            # Bulk: item duplikat/tidak valid dilaporkan per baris, sisanya tetap tersimpan
+            laporan = save_invoice_batch(data, db)
             db.session.commit()
-            return jsonify(message=f"{saved_count} faktur berhasil disimpan."), 201
+            naikkan_versi(*TABEL_FAKTUR)
+            ringkasan = {status: 0 for status in ("saved", "duplicate", "invalid")}
+            for item in laporan:
+                ringkasan[item["status"]] += 1
+            return jsonify(
+                message=f"{ringkasan['saved']} faktur berhasil disimpan.",
+                **ringkasan,
+                results=laporan,
+            ), 201 if ringkasan["saved"] else 200
 
         else:
             save_invoice_data(data, db)
             db.session.commit()
+            naikkan_versi(*TABEL_FAKTUR)
             return jsonify(message="Faktur berhasil disimpan."), 201
 
     except ValueError as ve:
@@ -94,12 +141,17 @@ def export_excel():
 
 @app.route("/api/history", methods=["GET"])
 def route_get_history():
-    return get_history()
+    return respon_cache("history", TABEL_FAKTUR, get_history)
 
 @app.route("/api/delete/<string:jenis>/<int:id>", methods=["DELETE"])
 def route_delete_faktur(jenis, id):
     return delete_faktur(jenis, id)
 
+# Body JSON: {"jenis", "ids"} dan/atau filter {"tahun", "bulan", "dari", "sampai"}
+@app.route("/api/delete/batch", methods=["POST"])
+def route_delete_faktur_batch():
+    return delete_faktur_batch(request.get_json(silent=True))
+
 @app.route("/api/bukti_setor/delete/<int:id>", methods=["DELETE"])
 def delete_bukti_setor_endpoint(id):
     return delete_bukti_setor(id)
@@ -0,0 +1,86 @@
+# benchmarks/bench_easyocr_batch.py
+"""
+Bandingkan EasyOCR readtext per halaman dengan rekognisi batch lintas
+halaman (readtext_batch) untuk beberapa ukuran batch: waktu per halaman dan
+jumlah halaman yang teksnya persis sama dengan readtext per halaman.
+
+Input berupa gambar atau PDF (semua halaman dirasterisasi); gambar melewati
+siapkan_gambar + preprocess_for_ocr seperti di endpoint bukti setor.
+
+Jalankan dari folder backend:
+    python -m benchmarks.bench_easyocr_batch file1.pdf gambar.jpg
+        [--batch 8 16 32] [--halaman N] [--repeat N] [--poppler PATH]
+"""
+
+import io
+import time
+import argparse
+import contextlib
+from PIL import Image
+from bukti_setor.utils.bukti_setor_processor import siapkan_gambar
+from bukti_setor.utils.helpers import preprocess_for_ocr
+from bukti_setor.utils.ocr_engine import get_reader, readtext_batch
+from shared_utils.pdf_utils import iter_halaman_pdf
+
+
+def muat_halaman(paths, poppler_path):
+    gambar = []
+    for path in paths:
+        if path.lower().endswith(".pdf"):
+            halaman = [img for _, img in iter_halaman_pdf(path, poppler_path)]
+        else:
+            halaman = [Image.open(path)]
+        with contextlib.redirect_stdout(io.StringIO()):
+            gambar.extend(preprocess_for_ocr(siapkan_gambar(img)) for img in halaman)
+    return gambar
+
+
+def ukur(fn, repeat):
+    hasil = None
+    start = time.perf_counter()
+    for _ in range(repeat):
+        hasil = fn()
+    return (time.perf_counter() - start) / repeat, hasil
+
+
+def teks(hasil_halaman):
+    return [item[1] for item in hasil_halaman]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--batch", type=int, nargs="+", default=[8, 16, 32])
+    parser.add_argument("--halaman", type=int, default=4, help="halaman per batch rekognisi")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--poppler")
+    args = parser.parse_args()
+
+    gambar = muat_halaman(args.files, args.poppler)
+    reader = get_reader({})
+    if not reader:
+        raise SystemExit("[❌ BENCH] EasyOCR reader tidak berhasil diinisialisasi")
+    print(f"[🧪 BENCH] {len(gambar)} halaman | {args.halaman} halaman per batch")
+
+    def per_halaman():
+        return [reader.readtext(img, detail=1, paragraph=False) for img in gambar]
+
+    def batch(ukuran):
+        hasil = []
+        for i in range(0, len(gambar), args.halaman):
+            hasil.extend(readtext_batch(reader, gambar[i:i + args.halaman], ukuran))
+        return hasil
+
+    detik, acuan = ukur(per_halaman, args.repeat)
+    print(f"[⏱️ BENCH] readtext     {detik / len(gambar) * 1000:9.1f} ms/halaman")
+    for ukuran in args.batch:
+        detik_batch, hasil = ukur(lambda: batch(ukuran), args.repeat)
+        sama = sum(teks(a) == teks(b) for a, b in zip(acuan, hasil))
+        print(
+            f"[⏱️ BENCH] batch {ukuran:<6d} {detik_batch / len(gambar) * 1000:9.1f} ms/halaman"
+            f" | speedup {detik / detik_batch:.2f}x | teks sama {sama}/{len(gambar)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# benchmarks/bench_ekstraksi.py
+"""
+Ukur biaya ekstraksi field faktur per halaman dari teks OCR.
+Mode "teks" memberi string mentah ke setiap ekstraktor (tiap ekstraktor
+mem-parse ulang), mode "dokumen" mem-parse sekali dengan DokumenFaktur.
+Biaya klasifikasi extract_jenis_pajak juga dilaporkan terpisah, dibandingkan
+dengan cara lama (clean_string + thefuzz per baris), dengan cache baris
+kosong (halaman pertama) maupun terisi (halaman berikutnya dari PDF yang sama).
+
+Jalankan dari folder backend:
+    python -m benchmarks.bench_ekstraksi [file_teks ...] [--repeat N] [--pt NAMA]
+"""
+
+import io
+import time
+import argparse
+import re
+import contextlib
+from faktur.utils.extraction import (
+    DokumenFaktur,
+    extract_faktur_tanggal,
+    extract_jenis_pajak,
+    extract_npwp_nama_rekanan,
+    extract_dpp,
+    extract_ppn,
+    extract_keterangan,
+)
+from faktur.utils.extraction import nama_pt
+from shared_utils.text_utils import clean_string
+
+DEFAULT_FILES = ["uploads/debug/debug_page_1.txt"]
+DEFAULT_PT = "PT PERKEBUNAN NUSANTARA IV"
+
+
+def ekstrak(teks, pt_utama):
+    """Urutan panggilan sama dengan _proses_halaman (tanpa ROI)."""
+    no_faktur, tanggal = extract_faktur_tanggal(teks)
+    jenis, blok, _ = extract_jenis_pajak(teks, pt_utama)
+    rekanan = extract_npwp_nama_rekanan(blok) if blok else None
+    dpp, _, override_ppn, _ = extract_dpp(teks)
+    ppn, _ = extract_ppn(teks, dpp, override_ppn)
+    keterangan = extract_keterangan(teks)
+    return no_faktur, tanggal, jenis, rekanan, dpp, ppn, keterangan
+
+
+def klasifikasi_lama(raw_text, pt_utama):
+    """extract_jenis_pajak sebelum matcher batch, sebagai acuan waktu dan hasil."""
+    from thefuzz import fuzz
+
+    pt_clean = clean_string(pt_utama)
+    parts = re.split(r"Pembeli\s+(?:Barang\s+)?Kena\s+Pajak", raw_text, flags=re.IGNORECASE)
+    if len(parts) < 2:
+        for line in raw_text.splitlines():
+            if fuzz.ratio(clean_string(line), pt_clean) > 80:
+                return "PPN_MASUKAN"
+        return None
+    blok_penjual, blok_pembeli = parts
+    for line in blok_pembeli.splitlines():
+        if fuzz.ratio(clean_string(line), pt_clean) > 70:
+            return "PPN_MASUKAN"
+    for line in blok_penjual.splitlines():
+        if fuzz.ratio(clean_string(line), pt_clean) > 70:
+            return "PPN_KELUARAN"
+    return None
+
+
+def klasifikasi_baru(raw_text, pt_utama):
+    return extract_jenis_pajak(raw_text, pt_utama)[0]
+
+
+def klasifikasi_dingin(raw_text, pt_utama):
+    """Seperti klasifikasi_baru tetapi tanpa cache baris, biaya halaman pertama."""
+    nama_pt.bersihkan.cache_clear()
+    return klasifikasi_baru(raw_text, pt_utama)
+
+
+def ukur(fn, halaman, repeat):
+    # Ekstraktor mencetak banyak log debug; jangan ikut diukur di terminal
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for teks in halaman:
+                fn(teks)
+        total = time.perf_counter() - start
+    return total / (repeat * len(halaman))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("files", nargs="*", default=DEFAULT_FILES)
+    parser.add_argument("--repeat", type=int, default=500)
+    parser.add_argument("--pt", default=DEFAULT_PT)
+    args = parser.parse_args()
+
+    halaman = []
+    for path in args.files:
+        with open(path, encoding="utf-8") as f:
+            halaman.append(f.read())
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        hasil_teks = [ekstrak(t, args.pt) for t in halaman]
+        hasil_dokumen = [ekstrak(DokumenFaktur(t), args.pt) for t in halaman]
+    if hasil_teks != hasil_dokumen:
+        raise SystemExit("[❌ BENCH] Hasil mode teks dan dokumen berbeda")
+
+    per_teks = ukur(lambda t: ekstrak(t, args.pt), halaman, args.repeat)
+    per_dokumen = ukur(lambda t: ekstrak(DokumenFaktur(t), args.pt), halaman, args.repeat)
+    print(f"[⏱️ BENCH] teks     {per_teks * 1000:8.3f} ms/halaman")
+    print(f"[⏱️ BENCH] dokumen  {per_dokumen * 1000:8.3f} ms/halaman")
+    print(f"[✅ BENCH] Speedup: {per_teks / per_dokumen:.2f}x")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        if [klasifikasi_lama(t, args.pt) for t in halaman] != [klasifikasi_baru(t, args.pt) for t in halaman]:
+            raise SystemExit("[❌ BENCH] Hasil klasifikasi lama dan baru berbeda")
+    per_lama = ukur(lambda t: klasifikasi_lama(t, args.pt), halaman, args.repeat)
+    # DokumenFaktur dibangun sekali per halaman dan dipakai bersama semua ekstraktor
+    dokumen = [DokumenFaktur(t) for t in halaman]
+    per_dingin = ukur(lambda d: klasifikasi_dingin(d, args.pt), dokumen, args.repeat)
+    per_baru = ukur(lambda d: klasifikasi_baru(d, args.pt), dokumen, args.repeat)
+    print(f"[⏱️ BENCH] klasifikasi lama    {per_lama * 1000:8.3f} ms/halaman")
+    print(f"[⏱️ BENCH] klasifikasi dingin  {per_dingin * 1000:8.3f} ms/halaman (cache baris kosong)")
+    print(f"[⏱️ BENCH] klasifikasi baru    {per_baru * 1000:8.3f} ms/halaman (cache baris terisi)")
+
+
+if __name__ == "__main__":
+    main()
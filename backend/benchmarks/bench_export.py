@@ -0,0 +1,109 @@
+# benchmarks/bench_export.py
+"""
+Bandingkan export Excel faktur mode streaming (workbook write-only +
+yield_per) dengan mode template (isi rekap_template.xlsx di memori): waktu,
+peak RSS, dan ukuran file untuk beberapa jumlah baris.
+
+Setiap ukuran data di-seed ulang (setengah masukan, setengah keluaran) dan
+setiap export dijalankan di subprocess baru supaya peak RSS tidak saling
+memengaruhi. Peak RSS dibaca dari /proc/self/status (Linux) atau
+getrusage (macOS).
+
+Jalankan dari folder backend:
+    python -m benchmarks.bench_export [--url sqlite:////tmp/bench_export.db]
+        [--rows 10000 100000 500000] [--mode stream template]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import subprocess
+from sqlalchemy import create_engine
+from models import db
+from benchmarks.bench_query_plan import seed, TABEL
+
+
+def peak_rss_mb():
+    # Linux: VmHWM proses ini saja (ru_maxrss ikut mewarisi puncak proses induk)
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # macOS: ru_maxrss dalam byte
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024)
+
+
+def worker(url, mode):
+    """Satu export di proses ini; cetak hasil sebagai JSON di baris terakhir stdout."""
+    from flask import Flask
+    from faktur.services.excel_exporter import tulis_excel_export
+
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI=url, EXPORT_STREAMING=(mode == "stream"))
+    db.init_app(app)
+
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        with app.app_context():
+            rss_awal = peak_rss_mb()
+            start = time.perf_counter()
+            tulis_excel_export(path)
+            detik = time.perf_counter() - start
+        print(json.dumps({
+            "detik": detik,
+            "rss_awal_mb": rss_awal,
+            "rss_puncak_mb": peak_rss_mb(),
+            "ukuran_mb": os.path.getsize(path) / (1024 * 1024),
+        }))
+    finally:
+        os.remove(path)
+
+
+def jalankan(url, mode):
+    hasil = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_export", "--worker", mode, "--url", url],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(hasil.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default=f"sqlite:///{os.path.join(tempfile.gettempdir(), 'bench_export.db')}")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 500_000])
+    parser.add_argument("--mode", nargs="+", choices=["stream", "template"], default=["stream", "template"])
+    parser.add_argument("--worker", choices=["stream", "template"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.url, args.worker)
+        return
+
+    engine = create_engine(args.url)
+    for rows in args.rows:
+        # Tabel benchmark selalu dibuat ulang: gunakan database khusus benchmark
+        db.metadata.drop_all(engine, tables=TABEL)
+        db.metadata.create_all(engine, tables=TABEL)
+        with engine.begin() as conn:
+            seed(conn, rows // 2)
+        print(f"\n[🧪 BENCH] {engine.dialect.name}: {rows} baris faktur")
+
+        for mode in args.mode:
+            h = jalankan(args.url, mode)
+            print(
+                f"[⏱️ BENCH] {mode:9s} {h['detik']:8.2f} s | {rows / h['detik']:9.0f} baris/s"
+                f" | peak RSS {h['rss_puncak_mb']:7.1f} MB (+{h['rss_puncak_mb'] - h['rss_awal_mb']:.1f} MB)"
+                f" | file {h['ukuran_mb']:.1f} MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# benchmarks/bench_ocr_backend.py
+"""
+Bandingkan latensi OCR per halaman antara pytesseract (subprocess per
+panggilan) dan tesserocr (handle Tesseract persisten).
+
+Jalankan dari folder backend:
+    python -m benchmarks.bench_ocr_backend [gambar ...] [--repeat N]
+"""
+
+import argparse
+import time
+import cv2
+from faktur.services.invoice_processor import OCR_LANG, OCR_CONFIG
+from faktur.utils.ocr_backend import BACKENDS, backend_tersedia, image_to_string
+
+DEFAULT_IMAGES = ["uploads/28df014f4c1253d7331fa935a12b8ab0_halaman_1.jpg"]
+
+
+def ukur(backend, images, repeat):
+    # Panggilan pertama dipisah supaya biaya muat traineddata terlihat
+    start = time.perf_counter()
+    image_to_string(images[0], OCR_LANG, OCR_CONFIG, backend=backend)
+    pertama = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for img in images:
+            image_to_string(img, OCR_LANG, OCR_CONFIG, backend=backend)
+    total = time.perf_counter() - start
+    return pertama, total / (repeat * len(images))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("images", nargs="*", default=DEFAULT_IMAGES)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    images = []
+    for path in args.images:
+        img = cv2.imread(path)
+        if img is None:
+            raise SystemExit(f"Gambar tidak bisa dibaca: {path}")
+        images.append(img)
+
+    hasil = {}
+    for backend in BACKENDS:
+        if not backend_tersedia(backend):
+            print(f"[⚠️ BENCH] {backend} tidak terpasang, dilewati")
+            continue
+        pertama, per_call = ukur(backend, images, args.repeat)
+        hasil[backend] = per_call
+        print(f"[⏱️ BENCH] {backend:12s} panggilan pertama {pertama * 1000:8.1f} ms | "
+              f"rata-rata {per_call * 1000:8.1f} ms/halaman")
+
+    if len(hasil) == 2:
+        print(f"[✅ BENCH] Speedup tesserocr: {hasil['pytesseract'] / hasil['tesserocr']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
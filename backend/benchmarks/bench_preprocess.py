@@ -0,0 +1,114 @@
+# benchmarks/bench_preprocess.py
+"""
+Bandingkan profil preprocessing bukti setor (none, light, denoise, binarize,
+dan auto): waktu preprocessing per gambar dan akurasi field hasil ekstraksi
+(kode_setor, jumlah, tanggal).
+
+Akurasi dihitung terhadap file --truth (JSON {nama_file: {field: nilai}}),
+atau jika tidak ada, terhadap hasil profil "denoise" (perilaku lama).
+
+Jalankan dari folder backend:
+    python -m benchmarks.bench_preprocess gambar1.jpg gambar2.png [--truth truth.json]
+        [--repeat N] [--no-ocr] [--sintetis]
+"""
+
+import os
+import io
+import json
+import time
+import argparse
+import contextlib
+from collections import Counter
+import cv2
+import numpy as np
+from PIL import Image
+from bukti_setor.utils.helpers import PROFILES, preprocess_for_ocr, pilih_profil
+from bukti_setor.utils.bukti_setor_processor import siapkan_gambar, ocr_dan_parse
+
+FIELDS = ("kode_setor", "jumlah", "tanggal")
+BASELINE = "denoise"
+
+
+def varian_sintetis(nama, img):
+    """Tambahkan versi ber-noise dan kontras rendah supaya semua cabang auto teruji."""
+    rng = np.random.default_rng(0)
+    noisy = np.clip(img.astype(np.int16) + rng.normal(0, 20, img.shape), 0, 255).astype(np.uint8)
+    pudar = (img.astype(np.float32) * 0.3 + 120).astype(np.uint8)
+    return [(f"{nama}#noise", noisy), (f"{nama}#pudar", pudar)]
+
+
+def muat_gambar(paths, sintetis):
+    hasil = []
+    for path in paths:
+        img = siapkan_gambar(Image.open(path))
+        nama = os.path.basename(path)
+        hasil.append((nama, img))
+        if sintetis:
+            hasil.extend(varian_sintetis(nama, img))
+    return hasil
+
+
+def ukur_profil(profil, gambar, repeat):
+    diproses = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        diproses = [preprocess_for_ocr(img, profil) for _, img in gambar]
+    per_gambar = (time.perf_counter() - start) / (repeat * len(gambar))
+    return per_gambar, diproses
+
+
+def akurasi(hasil, acuan):
+    benar = total = 0
+    for nama, fields in hasil.items():
+        target = acuan.get(nama.split("#")[0] if nama not in acuan else nama)
+        if not target:
+            continue
+        for field in FIELDS:
+            total += 1
+            benar += int(fields.get(field) == target.get(field))
+    return benar / total if total else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("images", nargs="+")
+    parser.add_argument("--truth")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-ocr", action="store_true")
+    parser.add_argument("--sintetis", action="store_true")
+    args = parser.parse_args()
+
+    gambar = muat_gambar(args.images, args.sintetis)
+    pilihan = Counter(pilih_profil(cv2.cvtColor(img, cv2.COLOR_BGR2GRAY))[0] for _, img in gambar)
+    print(f"[🧪 BENCH] {len(gambar)} gambar | pilihan auto: {dict(pilihan)}")
+
+    reader = None
+    if not args.no_ocr:
+        from bukti_setor.utils.ocr_engine import get_reader
+        reader = get_reader({})
+
+    hasil_per_profil = {}
+    waktu = {}
+    for profil in (*PROFILES, "auto"):
+        with contextlib.redirect_stdout(io.StringIO()):
+            waktu[profil], diproses = ukur_profil(profil, gambar, args.repeat)
+            if reader:
+                hasil_per_profil[profil] = {
+                    nama: ocr_dan_parse(reader, img) for (nama, _), img in zip(gambar, diproses)
+                }
+
+    acuan = None
+    if args.truth:
+        with open(args.truth, encoding="utf-8") as f:
+            acuan = json.load(f)
+    elif BASELINE in hasil_per_profil:
+        acuan = hasil_per_profil[BASELINE]
+
+    for profil, detik in waktu.items():
+        skor = akurasi(hasil_per_profil[profil], acuan) if reader and acuan else None
+        teks_skor = f"{skor * 100:6.1f}%" if skor is not None else "     -"
+        print(f"[⏱️ BENCH] {profil:9s} {detik * 1000:9.1f} ms/gambar | akurasi {teks_skor}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# benchmarks/bench_spellcheck.py
+"""
+Micro-benchmark koreksi ejaan token OCR bukti setor.
+
+Input berupa file teks, satu blok OCR per baris (mis. dump `cleaned_ocr` dari
+bukti setor asli). Tanpa argumen, dipakai contoh aliran token struk di bawah.
+Jika pyspellchecker terpasang, hasilnya dibandingkan dengan implementasi lama.
+
+Jalankan dari folder backend:
+    python -m benchmarks.bench_spellcheck [file_token ...] [--struk N]
+"""
+
+import time
+import argparse
+from bukti_setor.utils import spellcheck
+
+CONTOH_STRUK = [
+    "bukti penerimaan negara",
+    "ntpn 0a1b2c3d4e5f6g7h",
+    "tanggal setoran 12 januari 2024",
+    "jumlah setoran rp 1.500.000,00",
+    "kode billing 820240112345678",
+    "npwp 01.234.567.8-999.000",
+    "nama wajib pajak pt contoh sejahtera",
+    "jenis pajak 411211 kode setor 100",
+    "rekenlng pengirim 1234567890",
+    "bank mandiri cabang medan",
+    "tangga1 buku 12/01/2024",
+    "nomor referensi 20240112000123",
+    "setoram masa pajak desemper 2023",
+    "tota1 transaksi idr 1.500.000",
+    "validasi teller 0012",
+    "penerimaam negara lembar 1",
+]
+
+
+def muat_struk(paths):
+    if not paths:
+        return CONTOH_STRUK
+    blok = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            blok.extend(line.strip().lower() for line in f if line.strip())
+    return blok
+
+
+def koreksi_lama(spell, text):
+    return ' '.join([spell.correction(w) if w not in spell and spell.correction(w) else w for w in text.split()])
+
+
+def ukur(fn, stream):
+    start = time.perf_counter()
+    hasil = [fn(text) for text in stream]
+    return time.perf_counter() - start, hasil
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("files", nargs="*")
+    parser.add_argument("--struk", type=int, default=200, help="jumlah struk yang disimulasikan")
+    args = parser.parse_args()
+
+    blok = muat_struk(args.files)
+    stream = blok * args.struk
+    token = sum(len(t.split()) for t in stream)
+    print(f"[🧪 BENCH] {len(stream)} blok, {token} token")
+
+    spellcheck._koreksi_token.cache_clear()
+    detik_stream, _ = ukur(spellcheck.correct_spelling, stream)
+    info = spellcheck._koreksi_token.cache_info()
+    print(f"[⏱️ BENCH] symspell+cache {detik_stream * 1000:9.1f} ms | {token / detik_stream:12,.0f} token/s | "
+          f"cache hit {info.hits}/{info.hits + info.misses}")
+
+    spellcheck._koreksi_token.cache_clear()
+    detik, _ = ukur(spellcheck.correct_spelling, blok)
+    print(f"[⏱️ BENCH] symspell dingin {detik * 1000:8.1f} ms untuk {len(blok)} blok unik")
+
+    try:
+        from spellchecker import SpellChecker
+    except ImportError:
+        print("[⚠️ BENCH] pyspellchecker tidak terpasang, perbandingan dilewati")
+        return
+
+    # pyspellchecker sangat lambat pada token panjang, jadi cukup satu putaran blok unik
+    lama = SpellChecker(language=None, case_sensitive=False)
+    lama.word_frequency.load_text_file(spellcheck.kamus_path)
+    detik_lama, hasil_lama = ukur(lambda t: koreksi_lama(lama, t), blok)
+    print(f"[⏱️ BENCH] pyspellchecker {detik_lama * 1000:8.1f} ms untuk {len(blok)} blok unik")
+    print(f"[✅ BENCH] Speedup dingin: {detik_lama / detik:.1f}x | "
+          f"per struk dengan cache: {detik_lama / (detik_stream / args.struk):.1f}x")
+
+    hasil_baru = [spellcheck.correct_spelling(t) for t in blok]
+    beda = [(b, l, n) for b, l, n in zip(blok, hasil_lama, hasil_baru) if l != n]
+    print(f"[🔍 BENCH] Blok dengan hasil berbeda: {len(beda)}/{len(blok)}")
+    for asli, l, n in beda:
+        print(f"    {asli!r}\n      lama: {l!r}\n      baru: {n!r}")
+
+if __name__ == "__main__":
+    main()
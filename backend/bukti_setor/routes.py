@@ -6,14 +6,18 @@
 # ==============================================================================
 
 import os
+import uuid
 import traceback
 from flask import Blueprint, request, jsonify, current_app, send_from_directory
-from datetime import datetime
+from sqlalchemy import or_
 from models import BuktiSetor, db
 
 # shared_utils
 from shared_utils.text_utils import clean_transaction_value
 from shared_utils.file_utils import allowed_file, is_valid_image
+from shared_utils.job_queue import get_job_queue
+from shared_utils.db_utils import parse_limit, parse_tanggal_param, encode_cursor, decode_cursor
+from laporan.services import catat_setor, tambah_ke_ringkasan
 
 # local utils
 from bukti_setor.utils.bukti_setor_processor import extract_bukti_setor_data
@@ -21,7 +25,9 @@ from bukti_setor.utils.parsing.kode_setor import parse_kode_setor
 from bukti_setor.utils.parsing.tanggal import parse_tanggal
 from bukti_setor.utils.parsing.jumlah import parse_jumlah
 from bukti_setor.utils.bukti_setor_processor import preprocess_for_ocr, simpan_preview_image      
-from bukti_setor.services.delete import delete_bukti_setor
+from bukti_setor.services.delete import delete_bukti_setor, delete_bukti_setor_batch
+from bukti_setor.services.saver import siapkan_bukti_setor
+from shared_utils.response_cache import respon_cache, naikkan_versi
 from bukti_setor.services.excel_exporter_bukti_setor import generate_excel_bukti_setor_export  
 # ==============================================================================
 # Blueprints
@@ -56,28 +62,47 @@ def process_bukti_setor_endpoint():
         if os.path.exists(filepath):
             os.remove(filepath)
 
+# ========== ENDPOINT: PROSES FILE (ASINKRON) ==========
+@bukti_setor_bp.route('/process/jobs', methods=['POST'])
+def submit_bukti_setor_job_endpoint():
+    if 'file' not in request.files:
+        return jsonify(error="File tidak ditemukan"), 400
+
+    file = request.files['file']
+    upload_folder = current_app.config['UPLOAD_FOLDER']
+    filepath = os.path.join(upload_folder, f"job_{uuid.uuid4().hex}_{file.filename}")
+    file.save(filepath)
+
+    poppler_path = current_app.config.get('POPPLER_PATH')
+    job_id = get_job_queue().submit(
+        "bukti_setor", _proses_bukti_setor_job, filepath, poppler_path, file_input=filepath
+    )
+    return jsonify(job_id=job_id, status="queued", status_url=f"/api/jobs/{job_id}"), 202
+
+def _proses_bukti_setor_job(filepath, poppler_path, on_halaman=None):
+    try:
+        return extract_bukti_setor_data(filepath, poppler_path, on_halaman=on_halaman)
+    finally:
+        if os.path.exists(filepath):
+            os.remove(filepath)
+
 # ========== ENDPOINT: SIMPAN KE DB ==========
 @bukti_setor_bp.route('/save', methods=['POST'])
 def save_bukti_setor_endpoint():
     data = request.get_json()
     print("🚀 Data diterima di backend:", data)
 
-    kode_setor = data.get('kode_setor')
-    tanggal = data.get('tanggal')
-    jumlah = data.get('jumlah')
-
-    if not all([kode_setor, tanggal, jumlah]):
-        return jsonify(error="Field tidak lengkap"), 400
+    try:
+        values = siapkan_bukti_setor(data)
+    except ValueError as ve:
+        return jsonify(error=str(ve)), 400
 
     try:
-        tanggal_obj = datetime.strptime(tanggal, '%Y-%m-%d').date()
-        new_record = BuktiSetor(
-            tanggal=tanggal_obj,
-            kode_setor=str(kode_setor),
-            jumlah=float(jumlah)
-        )
+        new_record = BuktiSetor(**values)
         db.session.add(new_record)
+        tambah_ke_ringkasan(catat_setor({}, values["tanggal"], values["jumlah"]))
         db.session.commit()
+        naikkan_versi("bukti_setor")
         return jsonify(message="Data bukti setor berhasil disimpan!"), 201
     except Exception as e:
         db.session.rollback()
@@ -87,8 +112,44 @@ def save_bukti_setor_endpoint():
 # ========== ENDPOINT: AMBIL DATA HISTORY ==========
 @bukti_setor_bp.route('/history', methods=['GET'])
 def get_bukti_setor_history():
+    """?limit=&cursor=&dari=&sampai=&kode_setor= — keyset pagination pada (tanggal, id)."""
+    return respon_cache("bukti_setor_history", ("bukti_setor",), _bukti_setor_history)
+
+def _bukti_setor_history():
+    args = request.args
     try:
-        results = db.session.execute(db.select(BuktiSetor).order_by(BuktiSetor.tanggal.desc())).scalars().all()
+        limit = parse_limit(args.get("limit"))
+        dari = parse_tanggal_param(args.get("dari"), "dari")
+        sampai = parse_tanggal_param(args.get("sampai"), "sampai")
+        cursor = decode_cursor(args["cursor"], 2) if args.get("cursor") else None
+    except ValueError as ve:
+        return jsonify(error=str(ve)), 400
+
+    try:
+        stmt = db.select(
+            BuktiSetor.id, BuktiSetor.kode_setor, BuktiSetor.tanggal,
+            BuktiSetor.jumlah, BuktiSetor.created_at,
+        )
+        if dari:
+            stmt = stmt.where(BuktiSetor.tanggal >= dari)
+        if sampai:
+            stmt = stmt.where(BuktiSetor.tanggal <= sampai)
+        if args.get("kode_setor"):
+            stmt = stmt.where(BuktiSetor.kode_setor.startswith(args["kode_setor"], autoescape=True))
+        if cursor:
+            tanggal, id_cursor = cursor
+            stmt = stmt.where(
+                BuktiSetor.tanggal <= tanggal,
+                or_(BuktiSetor.tanggal < tanggal, BuktiSetor.id < id_cursor),
+            )
+        stmt = stmt.order_by(BuktiSetor.tanggal.desc(), BuktiSetor.id.desc()).limit(limit + 1)
+        results = db.session.execute(stmt).all()
+
+        next_cursor = None
+        if len(results) > limit:
+            results = results[:limit]
+            next_cursor = encode_cursor(results[-1].tanggal, results[-1].id)
+
         data = [{
             "id": row.id,
             "kode_setor": row.kode_setor,
@@ -96,7 +157,7 @@ def get_bukti_setor_history():
             "jumlah": float(row.jumlah),
             "created_at": row.created_at.strftime("%Y-%m-%d %H:%M:%S")
         } for row in results]
-        return jsonify(message="Data berhasil diambil.", data=data), 200
+        return jsonify(message="Data berhasil diambil.", data=data, next_cursor=next_cursor, limit=limit), 200
     except Exception as e:
         current_app.logger.error(f"Error fetching history: {e}\n{traceback.format_exc()}")
         return jsonify(error="Gagal mengambil data."), 500
@@ -106,6 +167,11 @@ def get_bukti_setor_history():
 def delete_bukti_setor_route(id):
     return delete_bukti_setor(id)
 
+# Body JSON: {"ids"} dan/atau filter {"tahun", "bulan", "dari", "sampai"}
+@bukti_setor_bp.route('/delete/batch', methods=["POST"])
+def delete_bukti_setor_batch_route():
+    return delete_bukti_setor_batch(request.get_json(silent=True))
+
 # ========== ENDPOINT: EXPORT EXCEL ==========
 @laporan_bp.route("/api/export_bukti_setor", methods=["GET"])
 def export_bukti_setor():
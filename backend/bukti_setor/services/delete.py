@@ -1,7 +1,11 @@
 # bukti_setor/services/delete.py
 
 from flask import jsonify
+from sqlalchemy import and_, true
 from models import db  # penting! karena lo butuh akses session
+from laporan.services import catat_setor, tambah_ke_ringkasan
+from shared_utils.db_utils import chunks, parse_ids, kondisi_periode, hapus_returning
+from shared_utils.response_cache import naikkan_versi
 
 def delete_bukti_setor(id):
     from models import BuktiSetor  # import di sini biar tidak circular
@@ -10,6 +14,48 @@ def delete_bukti_setor(id):
     if not bukti:
         return jsonify(message="Data bukti setor tidak ditemukan"), 404
 
+    tambah_ke_ringkasan(catat_setor({}, bukti.tanggal, bukti.jumlah, tanda=-1))
     db.session.delete(bukti)
     db.session.commit()
+    naikkan_versi("bukti_setor")
     return jsonify(message="Bukti setor berhasil dihapus!"), 200
+
+def delete_bukti_setor_batch(data):
+    """
+    Hapus banyak bukti setor dalam satu transaksi berdasarkan 'ids' dan/atau
+    filter tahun/bulan, dari/sampai: DELETE set-based (id IN per chunk),
+    ringkasan_bulanan ikut dikurangi.
+    """
+    from models import BuktiSetor  # import di sini biar tidak circular
+    if not isinstance(data, dict):
+        return jsonify(error="Request harus berupa objek JSON."), 400
+    try:
+        ids = parse_ids(data.get("ids"))
+        kondisi = kondisi_periode(BuktiSetor.tanggal, data)
+        if not ids and not kondisi:
+            # Cegah hapus seluruh tabel karena payload kosong
+            raise ValueError("Sertakan 'ids' atau filter (tahun/bulan, dari/sampai).")
+    except ValueError as ve:
+        return jsonify(error=str(ve)), 400
+
+    deleted = 0
+    deltas = {}
+    try:
+        for bagian in (chunks(ids) if ids else [None]):
+            where = and_(true(), *kondisi)
+            if bagian:
+                where = and_(where, BuktiSetor.id.in_(bagian))
+            rows = hapus_returning(db, BuktiSetor, where, BuktiSetor.tanggal, BuktiSetor.jumlah)
+            for tanggal, jumlah in rows:
+                catat_setor(deltas, tanggal, jumlah, tanda=-1)
+            deleted += len(rows)
+        tambah_ke_ringkasan(deltas)
+        db.session.commit()
+        if deleted:
+            naikkan_versi("bukti_setor")
+    except Exception as e:
+        db.session.rollback()
+        print(f"[❌ ERROR HAPUS BATCH] {e}")
+        return jsonify(error=str(e)), 500
+
+    return jsonify(message=f"{deleted} bukti setor berhasil dihapus.", deleted=deleted), 200
@@ -2,65 +2,84 @@
 # # ==============================================================================
 
 import os
-import tempfile
-from flask import send_file, jsonify
-from openpyxl import load_workbook, Workbook
-from openpyxl.styles import Alignment, Border, Font, Side
+from flask import current_app, jsonify, request
+from shared_utils.db_utils import parse_periode, kondisi_rentang
+from shared_utils.response_cache import export_cache
+from shared_utils.excel_stream import tulis_excel_stream, tulis_excel_template
 # ==============================================================================
 # File: backend/bukti_setor/services/excel_exporter_bukti_setor.py
 
-def generate_excel_bukti_setor_export(db):
-    try:
-        from models import BuktiSetor  # Pastikan model ini diimpor dari tempat yang benar
-
-        BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
-        template_path = os.path.join(BASE_DIR, "templates", "rekap_template_bukti_setor.xlsx")
-        template_path = os.path.normpath(template_path)
-        
-        print(f"[DEBUG] Path template bukti setor: {template_path}")
-        print(f"[DEBUG] Exists? {os.path.exists(template_path)}")
-        # Cek apakah template ada
-        if not os.path.exists(template_path):
-            return jsonify(error=f"Template tidak ditemukan di path: {template_path}"), 404
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+TEMPLATE_PATH = os.path.normpath(os.path.join(BASE_DIR, "templates", "rekap_template_bukti_setor.xlsx"))
 
-        wb = load_workbook(template_path)
-        ws = wb.active
+# Kolom Jumlah (berbasis 1) yang diberi format angka
+KOLOM_ANGKA = (3,)
 
-        # Ambil data dari database
-        data = db.session.execute(
-            db.select(BuktiSetor).order_by(BuktiSetor.tanggal.desc())
-        ).scalars().all()
+# Jumlah baris yang diambil dari cursor database per batch
+EXPORT_YIELD_PER = 1000
 
-        thin_border = Border(
-            left=Side(style="thin"),
-            right=Side(style="thin"),
-            top=Side(style="thin"),
-            bottom=Side(style="thin"),
-        )
-
-        start_row = 2  # Anggap template punya judul di baris 1-2
-        for idx, item in enumerate(data, start=start_row):
-            ws.cell(row=idx, column=1, value=item.tanggal.strftime("%Y-%m-%d")).border = thin_border
-            ws.cell(row=idx, column=2, value=item.kode_setor).border = thin_border
+def parse_filter_bukti_setor(args):
+    """Query string export bukti setor → dict filter. ValueError jika tidak valid."""
+    dari, sampai = parse_periode(args)
+    return {"dari": dari, "sampai": sampai, "kode_setor": args.get("kode_setor") or None}
 
-            jumlah_cell = ws.cell(row=idx, column=3, value=float(item.jumlah))
-            jumlah_cell.number_format = "#,##0.00"
-            jumlah_cell.border = thin_border
-
-            ws.cell(row=idx, column=4, value=item.created_at.strftime("%Y-%m-%d %H:%M:%S")).border = thin_border
+def generate_excel_bukti_setor_export(db):
+    """
+    GET /api/export_bukti_setor?tahun=&bulan=&dari=&sampai=&kode_setor=
+    Filter dijalankan di SQL; file dipakai ulang selama bukti_setor tidak berubah.
+    """
+    try:
+        filter_args = parse_filter_bukti_setor(request.args)
+    except ValueError as ve:
+        return jsonify(error=str(ve)), 400
 
-        # Simpan ke file sementara
-        temp = tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx")
-        wb.save(temp.name)
-        print(f"[✅] Export Bukti Setor berhasil ke: {temp.name}")
+    try:
+        print(f"[DEBUG] Path template bukti setor: {TEMPLATE_PATH}")
+        print(f"[DEBUG] Exists? {os.path.exists(TEMPLATE_PATH)}")
+        # Cek apakah template ada
+        if not os.path.exists(TEMPLATE_PATH):
+            return jsonify(error=f"Template tidak ditemukan di path: {TEMPLATE_PATH}"), 404
 
-        return send_file(
-            temp.name,
-            as_attachment=True,
-            download_name="rekap_bukti_setor.xlsx"
+        return export_cache(
+            "rekap_bukti_setor",
+            ("bukti_setor",),
+            lambda path: tulis_excel_bukti_setor(db, path, filter_args),
+            "rekap_bukti_setor.xlsx",
         )
 
     except Exception as e:
         print(f"[❌] Error generate Excel Bukti Setor: {e}")
         return jsonify({"error": str(e)}), 500
 
+def iter_baris_bukti_setor(db, filter_args=None):
+    """Baris rekap bukti setor (tanggal terbaru dulu) yang lolos filter, dibaca bertahap dengan yield_per."""
+    from models import BuktiSetor  # import di sini biar tidak circular
+
+    filter_args = filter_args or {}
+    stmt = db.select(
+        BuktiSetor.kode_setor,
+        BuktiSetor.tanggal,
+        BuktiSetor.jumlah,
+        BuktiSetor.created_at,
+    ).where(*kondisi_rentang(BuktiSetor.tanggal, filter_args.get("dari"), filter_args.get("sampai")))
+    if filter_args.get("kode_setor"):
+        stmt = stmt.where(BuktiSetor.kode_setor.startswith(filter_args["kode_setor"], autoescape=True))
+    stmt = stmt.order_by(BuktiSetor.tanggal.desc(), BuktiSetor.id.desc()).execution_options(yield_per=EXPORT_YIELD_PER)
+
+    # Urutan kolom mengikuti header template: Kode Setor, Tanggal, Jumlah, Dibuat pada
+    for row in db.session.execute(stmt):
+        yield [
+            row.kode_setor,
+            row.tanggal.strftime("%Y-%m-%d"),
+            float(row.jumlah),
+            row.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+        ]
+
+def tulis_excel_bukti_setor(db, path, filter_args=None, streaming=None):
+    """Tulis rekap bukti setor (setelah filter) ke path; mode mengikuti EXPORT_STREAMING."""
+    if streaming is None:
+        streaming = current_app.config.get("EXPORT_STREAMING", True)
+
+    tulis = tulis_excel_stream if streaming else tulis_excel_template
+    jumlah = tulis(path, TEMPLATE_PATH, iter_baris_bukti_setor(db, filter_args), KOLOM_ANGKA)
+    print(f"[✅] Export {jumlah} Bukti Setor berhasil ke: {path}")
@@ -0,0 +1,26 @@
+# bukti_setor/services/saver.py
+
+from datetime import datetime
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+
+def siapkan_bukti_setor(data):
+    """Validasi satu bukti setor → dict kolom BuktiSetor. ValueError jika tidak valid."""
+    kode_setor = data.get('kode_setor')
+    tanggal = data.get('tanggal')
+    jumlah = data.get('jumlah')
+
+    if not all([kode_setor, tanggal, jumlah]):
+        raise ValueError("Field tidak lengkap")
+
+    try:
+        tanggal_obj = datetime.strptime(tanggal, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise ValueError("Format tanggal tidak valid. Gunakan YYYY-MM-DD.")
+
+    try:
+        jumlah = Decimal(str(jumlah)).quantize(Decimal("0.01"), ROUND_HALF_UP)
+    except InvalidOperation:
+        raise ValueError("Jumlah harus berupa angka.")
+
+    return dict(tanggal=tanggal_obj, kode_setor=str(kode_setor), jumlah=jumlah)
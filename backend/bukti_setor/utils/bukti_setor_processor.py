@@ -2,30 +2,40 @@ import time
 from PIL import Image
 import numpy as np
 import cv2
-from pdf2image import convert_from_path
 from flask import current_app
-from .ocr_engine import OCR_READER
+from .ocr_engine import get_reader, readtext_batch
 from .spellcheck import correct_spelling
 from shared_utils.text_utils import clean_transaction_value, fuzzy_month_match
 from shared_utils.file_utils import allowed_file, is_valid_image, is_image_file
+from shared_utils.pdf_utils import iter_halaman_pdf, opsi_rasterisasi
 from .helpers import simpan_preview_image, preprocess_for_ocr
 from .parsing.tanggal import parse_tanggal
 from .parsing.jumlah import parse_jumlah
 from .parsing.kode_setor import parse_kode_setor
 
-def _extract_data_from_image(pil_image, upload_folder, page_num=1):
+def _extract_data_from_image(reader, pil_image, upload_folder, page_num=1, profil="auto"):
     start_total = time.time()
     preview_filename = simpan_preview_image(pil_image, upload_folder, page_num)
 
-    img_cv = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
+    processed_img = preprocess_for_ocr(siapkan_gambar(pil_image), profil)
+    return {**ocr_dan_parse(reader, processed_img), "preview_filename": preview_filename}
+
+def siapkan_gambar(pil_image):
+    """PIL → BGR dengan lebar maksimal MAX_WIDTH piksel."""
+    arr = np.array(pil_image)
+    img_cv = cv2.cvtColor(arr, cv2.COLOR_GRAY2BGR if arr.ndim == 2 else cv2.COLOR_RGB2BGR)
     MAX_WIDTH = 1000
     if img_cv.shape[1] > MAX_WIDTH:
         ratio = MAX_WIDTH / img_cv.shape[1]
         img_cv = cv2.resize(img_cv, None, fx=ratio, fy=ratio, interpolation=cv2.INTER_AREA)
+    return img_cv
 
-    processed_img = preprocess_for_ocr(img_cv)
-    ocr_results = OCR_READER.readtext(processed_img, detail=1, paragraph=False)
+def ocr_dan_parse(reader, processed_img):
+    """EasyOCR + spellcheck + parsing field dari gambar yang sudah dipreprocess."""
+    return parse_hasil_ocr(reader.readtext(processed_img, detail=1, paragraph=False))
 
+def parse_hasil_ocr(ocr_results):
+    """Spellcheck + parsing field dari hasil readtext satu halaman."""
     cleaned_ocr = [res[1].strip().lower() for res in ocr_results if len(res[1].strip()) >= 3]
     all_text_blocks = [correct_spelling(text) for text in cleaned_ocr]
     full_text_str = " ".join(all_text_blocks)
@@ -38,23 +48,51 @@ def _extract_data_from_image(pil_image, upload_folder, page_num=1):
         "kode_setor": kode_setor,
         "jumlah": jumlah,
         "tanggal": tanggal_obj.isoformat() if tanggal_obj else None,
-        "preview_filename": preview_filename
     }
 
-def extract_bukti_setor_data(filepath, poppler_path):
+def extract_bukti_setor_data(filepath, poppler_path, on_halaman=None):
     upload_folder = current_app.config['UPLOAD_FOLDER']
-    if not OCR_READER:
+    reader = get_reader(current_app.config)
+    if not reader:
         raise ConnectionError("EasyOCR reader tidak berhasil diinisialisasi.")
 
+    profil = current_app.config.get("BUKTI_SETOR_PREPROCESS", "auto")
+    batch_size = int(current_app.config.get("EASYOCR_BATCH_SIZE", 1))
     list_of_results = []
-    if filepath.lower().endswith('.pdf'):
-        all_pages_as_images = convert_from_path(filepath, poppler_path=poppler_path)
-        for i, page_image in enumerate(all_pages_as_images):
-            result_data = _extract_data_from_image(page_image, upload_folder, i + 1)
+    if filepath.lower().endswith('.pdf') and batch_size > 1:
+        opsi = opsi_rasterisasi(current_app.config)
+        halaman_per_batch = max(1, int(current_app.config.get("EASYOCR_BATCH_HALAMAN", 4)))
+        antrian = []
+
+        def proses_antrian():
+            # Deteksi per halaman, rekognisi crop semua halaman di antrian sekaligus
+            ocr_per_halaman = readtext_batch(reader, [img for _, img in antrian], batch_size)
+            for (preview_filename, _), ocr_results in zip(antrian, ocr_per_halaman):
+                result_data = {**parse_hasil_ocr(ocr_results), "preview_filename": preview_filename}
+                list_of_results.append(result_data)
+                if on_halaman:
+                    on_halaman(result_data)
+            antrian.clear()
+
+        for page_num, page_image in iter_halaman_pdf(filepath, poppler_path, **opsi):
+            preview_filename = simpan_preview_image(page_image, upload_folder, page_num)
+            antrian.append((preview_filename, preprocess_for_ocr(siapkan_gambar(page_image), profil)))
+            if len(antrian) >= halaman_per_batch:
+                proses_antrian()
+        if antrian:
+            proses_antrian()
+    elif filepath.lower().endswith('.pdf'):
+        opsi = opsi_rasterisasi(current_app.config)
+        for page_num, page_image in iter_halaman_pdf(filepath, poppler_path, **opsi):
+            result_data = _extract_data_from_image(reader, page_image, upload_folder, page_num, profil)
             list_of_results.append(result_data)
+            if on_halaman:
+                on_halaman(result_data)
     else:
         pil_image = Image.open(filepath)
-        result_data = _extract_data_from_image(pil_image, upload_folder)
+        result_data = _extract_data_from_image(reader, pil_image, upload_folder, profil=profil)
         list_of_results.append(result_data)
+        if on_halaman:
+            on_halaman(result_data)
 
     return list_of_results
@@ -33,7 +33,63 @@ def simpan_preview_image(pil_image, upload_folder, page_num, original_filename="
         current_app.logger.error(f"[❌ ERROR SIMPAN PREVIEW] {e}")
         return None
 
-def preprocess_for_ocr(image):
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    denoised = cv2.fastNlMeansDenoising(gray, None, 10, 7, 21)
-    return denoised
+# Profil preprocessing sebelum OCR, dari yang paling murah ke paling mahal
+PROFILES = {
+    "none": lambda gray: gray,
+    "light": lambda gray: cv2.medianBlur(gray, 3),
+    "denoise": lambda gray: cv2.fastNlMeansDenoising(gray, None, 10, 7, 21),
+    "binarize": lambda gray: cv2.adaptiveThreshold(
+        cv2.medianBlur(gray, 3), 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 10
+    ),
+}
+
+# Ambang statistik gambar untuk pemilihan profil otomatis
+NOISE_SEDANG = 3.0   # rata-rata |gray - median3| mulai perlu dihaluskan
+NOISE_TINGGI = 8.0   # noise berat, baru layak bayar fastNlMeansDenoising
+KONTRAS_RENDAH = 35  # selisih rata-rata latar dan tinta (split Otsu) di bawah ini → binarize
+
+
+def statistik_gambar(gray):
+    """
+    Estimasi noise dan kontras (murah, beberapa ms). Noise diukur di potongan
+    tengah resolusi asli karena downscale ikut meratakan noise; kontras adalah
+    selisih rata-rata kelas terang dan gelap hasil Otsu pada salinan kecil.
+    """
+    h, w = gray.shape[:2]
+    y0, x0 = max(0, h // 2 - 256), max(0, w // 2 - 256)
+    tengah = gray[y0:y0 + 512, x0:x0 + 512]
+    noise = float(np.mean(cv2.absdiff(tengah, cv2.medianBlur(tengah, 3))))
+
+    skala = min(1.0, 500 / max(h, w))
+    kecil = cv2.resize(gray, None, fx=skala, fy=skala, interpolation=cv2.INTER_AREA) if skala < 1 else gray
+    batas, _ = cv2.threshold(kecil, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    gelap, terang = kecil[kecil <= batas], kecil[kecil > batas]
+    kontras = float(terang.mean() - gelap.mean()) if gelap.size and terang.size else 0.0
+    return {"noise": round(noise, 2), "kontras": round(kontras, 1)}
+
+
+def pilih_profil(gray):
+    stats = statistik_gambar(gray)
+    if stats["noise"] >= NOISE_TINGGI:
+        profil = "denoise"
+    elif stats["kontras"] < KONTRAS_RENDAH:
+        profil = "binarize"
+    elif stats["noise"] >= NOISE_SEDANG:
+        profil = "light"
+    else:
+        profil = "none"
+    return profil, stats
+
+
+def preprocess_for_ocr(image, profil="auto"):
+    """
+    BGR → grayscale lalu jalankan profil preprocessing (lihat PROFILES).
+    profil="auto" (atau nama yang tidak dikenal) memilih profil dari statistik
+    noise/kontras gambar, sehingga struk bank yang bersih tidak ikut membayar
+    denoising.
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    if profil not in PROFILES:
+        profil, stats = pilih_profil(gray)
+        print(f"[🧪 PREPROCESS] Profil otomatis: {profil} {stats}")
+    return PROFILES[profil](gray)
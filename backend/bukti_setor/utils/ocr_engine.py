@@ -1,9 +1,122 @@
-import easyocr
+import time
+import threading
+import numpy as np
+import cv2
+
+# Reader EasyOCR dibuat saat pertama dibutuhkan (atau oleh hook gunicorn),
+# bukan saat modul di-import, supaya worker yang hanya melayani faktur/riwayat
+# tidak ikut memuat torch dan model deteksi/rekognisi.
+_reader = None
+_reader_lock = threading.Lock()
+_sudah_dicoba = False
+
+STARTUP_REPORT = {"status": "belum dimuat"}
+
+
+def _warm_up(reader):
+    """Satu inferensi kecil supaya alokasi tensor pertama tidak terjadi di request user."""
+    img = np.full((64, 320, 3), 255, dtype=np.uint8)
+    cv2.putText(img, "NTPN 2024", (10, 45), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 0), 2)
+    reader.readtext(img, detail=0)
+
+
+def _buat_reader(config):
+    gpu = bool(config.get("EASYOCR_GPU", False))
+    threads = int(config.get("EASYOCR_THREADS", 0))
+    warmup = bool(config.get("EASYOCR_WARMUP", True))
+    laporan = {"gpu": gpu, "threads": threads, "warmup": warmup}
 
-try:
     print("Inisialisasi EasyOCR Reader...")
-    OCR_READER = easyocr.Reader(['id', 'en'], gpu=True)
-    print("✅ EasyOCR Reader berhasil diinisialisasi.")
-except Exception as e:
-    print(f"❌ Error initializing EasyOCR: {e}")
-    OCR_READER = None
+    start = time.perf_counter()
+    import torch
+    import easyocr
+    laporan["import_seconds"] = round(time.perf_counter() - start, 3)
+
+    if threads > 0:
+        torch.set_num_threads(threads)
+
+    start = time.perf_counter()
+    reader = easyocr.Reader(['id', 'en'], gpu=gpu)
+    laporan["load_seconds"] = round(time.perf_counter() - start, 3)
+
+    if warmup:
+        start = time.perf_counter()
+        _warm_up(reader)
+        laporan["warmup_seconds"] = round(time.perf_counter() - start, 3)
+
+    laporan["status"] = "siap"
+    STARTUP_REPORT.clear()
+    STARTUP_REPORT.update(laporan)
+    print(f"✅ EasyOCR Reader berhasil diinisialisasi. {laporan}")
+    return reader
+
+
+def get_reader(config):
+    """
+    Kembalikan reader EasyOCR bersama untuk proses ini, dibuat sekali secara
+    thread-safe. Mengembalikan None jika inisialisasi gagal (tidak dicoba ulang).
+    """
+    global _reader, _sudah_dicoba
+    if _sudah_dicoba:
+        return _reader
+
+    with _reader_lock:
+        if not _sudah_dicoba:
+            try:
+                _reader = _buat_reader(config)
+            except Exception as e:
+                print(f"❌ Error initializing EasyOCR: {e}")
+                STARTUP_REPORT.clear()
+                STARTUP_REPORT.update({"status": "gagal", "error": str(e)})
+                _reader = None
+            _sudah_dicoba = True
+    return _reader
+
+
+def _internal_rekognisi():
+    """Fungsi internal EasyOCR untuk rekognisi batch, atau None jika versi ini tidak punya."""
+    try:
+        from easyocr import easyocr as modul_easyocr
+        from easyocr.utils import reformat_input, get_image_list
+        from easyocr.recognition import get_text
+        return modul_easyocr.imgH, reformat_input, get_image_list, get_text
+    except (ImportError, AttributeError) as e:
+        print(f"[⚠️ EasyOCR] Rekognisi batch tidak tersedia ({e}), pakai readtext per halaman")
+        return None
+
+
+def readtext_batch(reader, images, batch_size):
+    """
+    Setara [reader.readtext(img, detail=1, paragraph=False) for img in images]:
+    deteksi tetap per gambar, tetapi crop teks dari semua gambar dikenali
+    bersama dengan batch_size crop per forward pass recognizer.
+    """
+    internal = _internal_rekognisi() if batch_size > 1 else None
+    if internal is None:
+        return [reader.readtext(img, detail=1, paragraph=False) for img in images]
+    img_h, reformat_input, get_image_list, get_text = internal
+
+    crops, pemilik = [], []
+    max_width = img_h
+    for idx, image in enumerate(images):
+        img, img_cv_grey = reformat_input(image)
+        horizontal_list, free_list = reader.detect(img, reformat=False)
+        # Urutan sama dengan readtext batch_size=1: kotak horizontal lalu kotak bebas
+        for h_list, f_list in [([box], []) for box in horizontal_list[0]] + [([], [box]) for box in free_list[0]]:
+            image_list, lebar = get_image_list(h_list, f_list, img_cv_grey, model_height=img_h)
+            crops.extend(image_list)
+            pemilik.extend([idx] * len(image_list))
+            max_width = max(max_width, lebar)
+
+    per_gambar = [[] for _ in images]
+    if not crops:
+        return per_gambar
+
+    ignore_char = "".join(set(reader.character) - set(reader.lang_char))
+    hasil = get_text(
+        reader.character, img_h, int(max_width), reader.recognizer, reader.converter, crops,
+        ignore_char, batch_size=batch_size, workers=0, device=reader.device,
+    )
+    for idx, item in zip(pemilik, hasil):
+        per_gambar[idx].append(item)
+    return per_gambar
@@ -1,13 +1,95 @@
-from spellchecker import SpellChecker
 import os
+import re
+from functools import lru_cache
+from shared_utils.text_utils import jarak_edit
 
-SPELL = SpellChecker(language=None, case_sensitive=False)
+MAX_EDIT = 2
+CACHE_SIZE = 4096
+
+
+def _variasi_hapus(word, max_edit):
+    """Semua string hasil menghapus 0..max_edit karakter dari word."""
+    hasil = {word}
+    lapisan = {word}
+    for _ in range(max_edit):
+        lapisan = {w[:i] + w[i + 1:] for w in lapisan for i in range(len(w))}
+        hasil |= lapisan
+    return hasil
+
+
+class SymSpell:
+    """
+    Koreksi ejaan symmetric-delete: varian hapus (≤ max_edit) setiap kata kamus
+    diindeks sekali saat dimuat, sehingga lookup cukup membangkitkan varian hapus
+    token lalu memverifikasi kandidat dengan jarak edit sebenarnya.
+    Kandidat terbaik: jarak terkecil, lalu frekuensi tertinggi, lalu alfabetis.
+    """
+
+    def __init__(self, max_edit=MAX_EDIT):
+        self.max_edit = max_edit
+        self.words = {}
+        self.index = {}
+        self.max_len = 0
+
+    def load_text_file(self, path):
+        with open(path, encoding="utf-8") as f:
+            for word in re.findall(r"\w+", f.read().lower()):
+                self.add_word(word)
+
+    def add_word(self, word, count=1):
+        if word not in self.words:
+            for varian in _variasi_hapus(word, self.max_edit):
+                self.index.setdefault(varian, []).append(word)
+            self.max_len = max(self.max_len, len(word))
+        self.words[word] = self.words.get(word, 0) + count
+
+    def __contains__(self, word):
+        return word.lower() in self.words
+
+    def correction(self, word):
+        word = word.lower()
+        if word in self.words:
+            return word
+        if len(word) - self.max_edit > self.max_len:
+            return None
+
+        terbaik = None
+        diperiksa = set()
+        for varian in _variasi_hapus(word, self.max_edit):
+            for kandidat in self.index.get(varian, ()):
+                if kandidat in diperiksa:
+                    continue
+                diperiksa.add(kandidat)
+                jarak = jarak_edit(word, kandidat, self.max_edit)
+                if jarak > self.max_edit:
+                    continue
+                kunci = (jarak, -self.words[kandidat], kandidat)
+                if terbaik is None or kunci < terbaik:
+                    terbaik = kunci
+        return terbaik[2] if terbaik else None
+
+
+SPELL = SymSpell()
 try:
     kamus_path = os.path.join(os.path.dirname(__file__), 'kamus_indonesia.txt')
-    SPELL.word_frequency.load_text_file(kamus_path)
+    SPELL.load_text_file(kamus_path)
     print(f"Kamus Indonesia berhasil dimuat dari: {kamus_path}")
 except Exception as e:
     print(f"Error memuat kamus Indonesia: {e}")
 
+
+def _mirip_angka(w):
+    """Token angka/ID (nominal, NTPN, nomor rekening) tidak perlu dikoreksi."""
+    digit = sum(ch.isdigit() for ch in w)
+    return digit * 2 >= len(w) or not any(ch.isalpha() for ch in w)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _koreksi_token(w):
+    if w in SPELL or _mirip_angka(w):
+        return w
+    return SPELL.correction(w) or w
+
+
 def correct_spelling(text):
-    return ' '.join([SPELL.correction(w) if w not in SPELL and SPELL.correction(w) else w for w in text.split()])
+    return ' '.join(_koreksi_token(w) for w in text.split())
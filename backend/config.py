@@ -22,3 +22,78 @@ class Config:
     UPLOAD_FOLDER = "uploads"
     if not os.path.exists(UPLOAD_FOLDER):
         os.makedirs(UPLOAD_FOLDER)
+
+    # Jumlah proses paralel untuk OCR per halaman faktur (1 = berurutan). Satu
+    # process pool berukuran ini dipakai bersama semua request per proses
+    OCR_WORKERS = int(os.getenv("OCR_WORKERS", "1"))
+
+    # Cache teks OCR di disk (UPLOAD_FOLDER/ocr_cache), dibatasi ukuran total dalam MB
+    OCR_CACHE_ENABLED = os.getenv("OCR_CACHE_ENABLED", "1") == "1"
+    OCR_CACHE_MAX_MB = int(os.getenv("OCR_CACHE_MAX_MB", "200"))
+
+    # Rasterisasi PDF per halaman: resolusi, mode grayscale, thread pdftoppm,
+    # dan jumlah halaman yang dirender sekaligus
+    PDF_DPI = int(os.getenv("PDF_DPI", "200"))
+    PDF_GRAYSCALE = os.getenv("PDF_GRAYSCALE", "0") == "1"
+    PDF_THREAD_COUNT = int(os.getenv("PDF_THREAD_COUNT", "1"))
+    PDF_WINDOW = int(os.getenv("PDF_WINDOW", "1"))
+
+    # Job OCR asinkron: jumlah thread worker per proses, umur record job setelah
+    # selesai (detik), dan batas waktu sejak submit sebelum job yang tidak
+    # selesai (worker mati/restart) dianggap gagal
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+    JOB_TTL_SECONDS = int(os.getenv("JOB_TTL_SECONDS", "3600"))
+    JOB_MAX_RUNTIME_SECONDS = int(os.getenv("JOB_MAX_RUNTIME_SECONDS", "7200"))
+
+    # Batch upload faktur (/api/process/batch): jumlah file paralel, batas file per
+    # batch, dan batas total ukuran isi ZIP setelah diekstrak (MB)
+    BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "4"))
+    BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "500"))
+    BATCH_MAX_UNZIPPED_MB = int(os.getenv("BATCH_MAX_UNZIPPED_MB", "500"))
+
+    # Pakai text layer bawaan PDF (e-Faktur digital) dan lewati OCR jika teksnya
+    # berisi minimal TEXT_LAYER_MIN_CHARS karakter alfanumerik
+    PDF_TEXT_LAYER = os.getenv("PDF_TEXT_LAYER", "1") == "1"
+    TEXT_LAYER_MIN_CHARS = int(os.getenv("TEXT_LAYER_MIN_CHARS", "100"))
+
+    # Mode OCR faktur: "full" (OCR satu halaman penuh) atau "layout"
+    # (cari anchor label e-Faktur lalu OCR ulang region per field)
+    FAKTUR_OCR_MODE = os.getenv("FAKTUR_OCR_MODE", "full")
+
+    # Backend OCR faktur: "pytesseract" (subprocess per panggilan) atau "tesserocr"
+    # (handle Tesseract persisten per worker, butuh paket tesserocr)
+    OCR_BACKEND = os.getenv("OCR_BACKEND", "pytesseract")
+
+    # EasyOCR (bukti setor) dimuat saat pertama dipakai. Default CPU-only;
+    # EASYOCR_THREADS=0 memakai jumlah thread bawaan torch. EASYOCR_WARMUP
+    # menjalankan satu inferensi kecil setelah model dimuat, EASYOCR_PRELOAD
+    # memuat reader di hook gunicorn sebelum worker menerima request.
+    EASYOCR_GPU = os.getenv("EASYOCR_GPU", "0") == "1"
+    EASYOCR_THREADS = int(os.getenv("EASYOCR_THREADS", "0"))
+    EASYOCR_WARMUP = os.getenv("EASYOCR_WARMUP", "1") == "1"
+    EASYOCR_PRELOAD = os.getenv("EASYOCR_PRELOAD", "0") == "1"
+
+    # Rekognisi batch EasyOCR untuk PDF bukti setor multi-halaman: deteksi tetap
+    # per halaman, crop teks dari EASYOCR_BATCH_HALAMAN halaman dikenali bersama
+    # dengan EASYOCR_BATCH_SIZE crop per forward pass. 1 = readtext per halaman.
+    EASYOCR_BATCH_SIZE = int(os.getenv("EASYOCR_BATCH_SIZE", "1"))
+    EASYOCR_BATCH_HALAMAN = int(os.getenv("EASYOCR_BATCH_HALAMAN", "4"))
+
+    # Cache respons history/export dengan ETag, dikunci versi tabel yang diganti
+    # setiap save/delete/impor. Versi dan file export di UPLOAD_FOLDER/cache,
+    # body JSON di memori per worker (maks RESPONSE_CACHE_ENTRIES entri).
+    # Matikan jika tabel juga diubah di luar aplikasi ini.
+    RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "1") == "1"
+    RESPONSE_CACHE_ENTRIES = int(os.getenv("RESPONSE_CACHE_ENTRIES", "256"))
+
+    # Export Excel faktur: 1 = workbook write-only (memori konstan, baris dibaca
+    # dengan yield_per, header dari template); 0 = isi template di memori
+    EXPORT_STREAMING = os.getenv("EXPORT_STREAMING", "1") == "1"
+
+    # Impor massal CSV/XLSX (/api/import, flask impor file): baris per chunk,
+    # tiap chunk dimuat dengan COPY (PostgreSQL) atau executemany lalu di-commit
+    IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "5000"))
+
+    # Preprocessing gambar bukti setor sebelum EasyOCR: "auto" (pilih dari
+    # statistik noise/kontras), atau paksa salah satu: none, light, denoise, binarize
+    BUKTI_SETOR_PREPROCESS = os.getenv("BUKTI_SETOR_PREPROCESS", "auto")
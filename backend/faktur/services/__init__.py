@@ -1,7 +1,8 @@
 # services/__init__.py
 
-from .invoice_processor import process_invoice_file
-from .file_saver import save_invoice_data
+from .invoice_processor import process_invoice_file, submit_invoice_job
+from .batch_processor import process_invoice_batch
+from .file_saver import save_invoice_data, save_invoice_batch
 from .excel_exporter import generate_excel_export
 from .history import get_history
 from .delete import delete_faktur
\ No newline at end of file
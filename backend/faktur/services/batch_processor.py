@@ -0,0 +1,160 @@
+# faktur/services/batch_processor.py
+
+import os
+import time
+import uuid
+import shutil
+import zipfile
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from flask import jsonify, current_app
+from shared_utils.file_utils import allowed_file
+from .invoice_processor import proses_faktur
+
+
+def process_invoice_batch(request, config):
+    """
+    Proses banyak file faktur dalam satu request: beberapa file di field
+    'files' atau satu arsip ZIP di field 'file'. File disebar ke thread pool
+    berukuran BATCH_WORKERS, hasilnya dikelompokkan per nama file dan halaman.
+    """
+    nama_pt_utama = request.form.get("nama_pt_utama", "").strip()
+    if not nama_pt_utama:
+        return jsonify(error="Nama PT Utama wajib diisi"), 400
+
+    uploads = request.files.getlist("files") or request.files.getlist("file")
+    if not uploads:
+        return jsonify(error="File tidak ditemukan"), 400
+
+    batch_dir = os.path.join(config["UPLOAD_FOLDER"], f"batch_{uuid.uuid4().hex}")
+    os.makedirs(batch_dir)
+
+    try:
+        max_files = int(config.get("BATCH_MAX_FILES", 500))
+        max_bytes = int(config.get("BATCH_MAX_UNZIPPED_MB", 500)) * 1024 * 1024
+
+        # Batas jumlah file dan ukuran isi ZIP dicek sebelum ada yang ditulis ke disk
+        daftar_file = []
+        try:
+            for upload in uploads:
+                if upload.filename.lower().endswith(".zip"):
+                    hasil_zip, ukuran = _ekstrak_zip(upload, batch_dir, max_files - len(daftar_file), max_bytes)
+                    daftar_file.extend(hasil_zip)
+                    max_bytes -= ukuran
+                elif allowed_file(upload.filename):
+                    if len(daftar_file) >= max_files:
+                        raise ValueError(f"Batch maksimal {max_files} file")
+                    daftar_file.append(_simpan_upload(upload, batch_dir))
+        except ValueError as ve:
+            return jsonify(error=str(ve)), 400
+
+        if not daftar_file:
+            return jsonify(error="Tidak ada file PDF/gambar yang didukung di dalam batch"), 400
+
+        # Paralelisme di level file; OCR per file dijalankan berurutan
+        config_file = dict(config, OCR_WORKERS=1)
+        app = current_app._get_current_object()
+        workers = min(int(config.get("BATCH_WORKERS", 4)), len(daftar_file))
+
+        def proses_satu(item):
+            filename, filepath = item
+            with app.app_context():
+                try:
+                    return proses_faktur(filepath, filename, nama_pt_utama, config_file)
+                except Exception as e:
+                    print(f"[❌ ERROR BATCH] {filename}: {traceback.format_exc()}")
+                    return {"error": str(e)}
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            hasil_per_file = list(executor.map(proses_satu, daftar_file))
+        elapsed = time.perf_counter() - start
+
+        results = {}
+        total_halaman = 0
+        gagal_halaman = 0
+        gagal_file = 0
+        for (filename, _), hasil in zip(daftar_file, hasil_per_file):
+            kunci = _kunci_unik(filename, results)
+            if "error" in hasil:
+                gagal_file += 1
+                results[kunci] = {"error": hasil["error"]}
+                continue
+
+            halaman = {}
+            for idx, hasil_halaman in enumerate(hasil["results"], start=1):
+                nomor = hasil_halaman.get("data", {}).get("halaman", idx)
+                halaman[str(nomor)] = hasil_halaman
+                if "error" in hasil_halaman:
+                    gagal_halaman += 1
+            total_halaman += hasil["total_halaman"]
+            results[kunci] = {"total_halaman": hasil["total_halaman"], "halaman": halaman}
+
+        stats = {
+            "files": len(daftar_file),
+            "pages": total_halaman,
+            "failed_files": gagal_file,
+            "failed_pages": gagal_halaman,
+            "workers": workers,
+            "elapsed_seconds": round(elapsed, 3),
+            "pages_per_sec": round(total_halaman / elapsed, 3) if elapsed > 0 else None,
+        }
+        print(f"[📦 BATCH] {stats}")
+        return jsonify(success=True, results=results, stats=stats), 200
+
+    except zipfile.BadZipFile:
+        return jsonify(error="File ZIP tidak valid"), 400
+
+    except Exception:
+        print(f"[❌ ERROR] {traceback.format_exc()}")
+        return jsonify(error=traceback.format_exc()), 500
+
+    finally:
+        shutil.rmtree(batch_dir, ignore_errors=True)
+
+
+def _simpan_upload(upload, batch_dir):
+    filename = os.path.basename(upload.filename)
+    filepath = os.path.join(batch_dir, f"{uuid.uuid4().hex[:8]}_{filename}")
+    upload.save(filepath)
+    return filename, filepath
+
+
+def _ekstrak_zip(upload, batch_dir, sisa_file, sisa_bytes):
+    """
+    Ekstrak file yang didukung dari ZIP ke batch_dir → (list file, total byte).
+    Jumlah file dan total ukuran asli (file_size di central directory, yang
+    juga membatasi jumlah byte yang dibaca zipfile) dicek dari infolist()
+    sebelum ada yang diekstrak; ValueError jika melebihi sisa_file/sisa_bytes.
+    """
+    hasil = []
+    with zipfile.ZipFile(upload.stream) as zf:
+        anggota = []
+        for info in zf.infolist():
+            # basename saja, supaya path di dalam ZIP tidak bisa keluar dari batch_dir
+            filename = os.path.basename(info.filename)
+            if info.is_dir() or not filename or not allowed_file(filename):
+                continue
+            anggota.append((info, filename))
+
+        ukuran = sum(info.file_size for info, _ in anggota)
+        if len(anggota) > sisa_file:
+            raise ValueError("Jumlah file di dalam batch melebihi batas (BATCH_MAX_FILES)")
+        if ukuran > sisa_bytes:
+            raise ValueError("Total ukuran isi ZIP melebihi batas (BATCH_MAX_UNZIPPED_MB)")
+
+        for info, filename in anggota:
+            filepath = os.path.join(batch_dir, f"{uuid.uuid4().hex[:8]}_{filename}")
+            with zf.open(info) as src, open(filepath, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            hasil.append((filename, filepath))
+    return hasil, ukuran
+
+
+def _kunci_unik(filename, results):
+    kunci = filename
+    n = 2
+    while kunci in results:
+        kunci = f"{filename} ({n})"
+        n += 1
+    return kunci
@@ -1,8 +1,14 @@
 # faktur/services/delete.py
 
 from flask import jsonify
+from sqlalchemy import and_, true
 from models import PpnMasukan, PpnKeluaran
 from models import db  # penting! karena lo butuh akses session
+from laporan.services import catat_faktur, catat_setor, tambah_ke_ringkasan
+from shared_utils.db_utils import chunks, parse_ids, kondisi_periode, hapus_returning
+from shared_utils.response_cache import naikkan_versi
+
+JENIS_MODEL = {"masukan": PpnMasukan, "keluaran": PpnKeluaran}
 
 def delete_faktur(jenis, id):
     model = PpnMasukan if jenis.lower() == "masukan" else PpnKeluaran
@@ -11,10 +17,60 @@ def delete_faktur(jenis, id):
     if not faktur:
         return jsonify(message="Data tidak ditemukan"), 404
 
+    tambah_ke_ringkasan(catat_faktur({}, model, faktur.tanggal, faktur.dpp, faktur.ppn, tanda=-1))
     db.session.delete(faktur)
     db.session.commit()
+    naikkan_versi(model.__tablename__)
     return jsonify(message="Faktur berhasil dihapus!"), 200
 
+def delete_faktur_batch(data):
+    """
+    Hapus banyak faktur dalam satu transaksi: berdasarkan 'ids' (wajib dengan
+    'jenis') dan/atau filter tahun/bulan, dari/sampai, jenis. Tiap tabel satu
+    DELETE set-based (id IN per chunk), ringkasan_bulanan ikut dikurangi.
+    """
+    if not isinstance(data, dict):
+        return jsonify(error="Request harus berupa objek JSON."), 400
+    try:
+        jenis = data.get("jenis") or None
+        if jenis and (not isinstance(jenis, str) or jenis not in JENIS_MODEL):
+            raise ValueError("Parameter 'jenis' harus 'masukan' atau 'keluaran'.")
+        ids = parse_ids(data.get("ids"))
+        if ids and not jenis:
+            raise ValueError("Parameter 'ids' harus disertai 'jenis'.")
+        kondisi = {nama: kondisi_periode(model.tanggal, data) for nama, model in JENIS_MODEL.items()}
+        if not ids and not kondisi["masukan"]:
+            # Cegah hapus seluruh tabel karena payload kosong / hanya 'jenis'
+            raise ValueError("Sertakan 'ids' atau filter periode (tahun/bulan, dari/sampai).")
+    except ValueError as ve:
+        return jsonify(error=str(ve)), 400
+
+    deleted = {}
+    deltas = {}
+    try:
+        for nama, model in JENIS_MODEL.items():
+            if jenis and nama != jenis:
+                continue
+            deleted[nama] = 0
+            for bagian in (chunks(ids) if ids else [None]):
+                where = and_(true(), *kondisi[nama])
+                if bagian:
+                    where = and_(where, model.id.in_(bagian))
+                rows = hapus_returning(db, model, where, model.tanggal, model.dpp, model.ppn)
+                for tanggal, dpp, ppn in rows:
+                    catat_faktur(deltas, model, tanggal, dpp, ppn, tanda=-1)
+                deleted[nama] += len(rows)
+        tambah_ke_ringkasan(deltas)
+        db.session.commit()
+        naikkan_versi(*(JENIS_MODEL[nama].__tablename__ for nama, jumlah in deleted.items() if jumlah))
+    except Exception as e:
+        db.session.rollback()
+        print(f"[❌ ERROR HAPUS BATCH] {e}")
+        return jsonify(error=str(e)), 500
+
+    total = sum(deleted.values())
+    return jsonify(message=f"{total} faktur berhasil dihapus.", deleted=total, per_jenis=deleted), 200
+
 def delete_bukti_setor(id):
     from models import BuktiSetor  # import di sini biar tidak circular
     bukti = db.session.get(BuktiSetor, id)
@@ -22,6 +78,8 @@ def delete_bukti_setor(id):
     if not bukti:
         return jsonify(message="Data bukti setor tidak ditemukan"), 404
 
+    tambah_ke_ringkasan(catat_setor({}, bukti.tanggal, bukti.jumlah, tanda=-1))
     db.session.delete(bukti)
     db.session.commit()
+    naikkan_versi("bukti_setor")
     return jsonify(message="Bukti setor berhasil dihapus!"), 200
@@ -2,29 +2,94 @@
 # ==============================================================================
 
 import os
-import tempfile
-from flask import send_file, jsonify
-from openpyxl import load_workbook, Workbook
-from openpyxl.styles import Alignment, Border, Font, Side
-from models import PpnMasukan, PpnKeluaran
+from flask import current_app, jsonify, request
+from openpyxl import Workbook
+from models import db, PpnMasukan, PpnKeluaran, BuktiSetor
+from shared_utils.db_utils import parse_periode, kondisi_rentang
+from shared_utils.response_cache import export_cache
+from shared_utils.excel_stream import tambah_sheet, tulis_excel_stream, tulis_excel_template
+from bukti_setor.services.excel_exporter_bukti_setor import (
+    TEMPLATE_PATH as TEMPLATE_BUKTI_SETOR,
+    KOLOM_ANGKA as KOLOM_ANGKA_BUKTI_SETOR,
+    parse_filter_bukti_setor,
+    iter_baris_bukti_setor,
+)
+
+TABEL_EXPORT = (PpnMasukan.__tablename__, PpnKeluaran.__tablename__)
+JENIS_EXPORT = {"masukan": (PpnMasukan, "PPN MASUKAN"), "keluaran": (PpnKeluaran, "PPN KELUARAN")}
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+TEMPLATE_PATH = os.path.normpath(os.path.join(BASE_DIR, "templates", "rekap_template.xlsx"))
+
+# Kolom DPP, PPN, Jumlah (berbasis 1) yang diberi format angka
+KOLOM_ANGKA = (7, 8, 9)
+
+# Jumlah baris yang diambil dari cursor database per batch
+EXPORT_YIELD_PER = 1000
+
+def parse_filter_export(args):
+    """Query string export faktur → dict filter. ValueError jika tidak valid."""
+    jenis = args.get("jenis") or None
+    if jenis and jenis not in JENIS_EXPORT:
+        raise ValueError("Parameter 'jenis' harus 'masukan' atau 'keluaran'.")
+    dari, sampai = parse_periode(args)
+    return {"jenis": jenis, "npwp": args.get("npwp") or None, "dari": dari, "sampai": sampai}
 
 def generate_excel_export(db):
+    """
+    GET /api/export?tahun=&bulan=&dari=&sampai=&jenis=masukan|keluaran&npwp=
+    Filter masa pajak dijalankan di SQL. Dengan &bukti_setor=1 hasilnya satu
+    workbook berisi sheet faktur dan sheet bukti setor untuk periode yang sama.
+    File dipakai ulang selama tabel sumbernya tidak berubah.
+    """
     try:
+        filter_args = parse_filter_export(request.args)
+        filter_bukti_setor = parse_filter_bukti_setor(request.args)
+    except ValueError as ve:
+        return jsonify(error=str(ve)), 400
 
-        wb = Workbook()
-        ws = wb.active
+    try:
+        if request.args.get("bukti_setor") == "1":
+            return export_cache(
+                "rekap_pajak_lengkap",
+                TABEL_EXPORT + (BuktiSetor.__tablename__,),
+                lambda path: tulis_excel_lengkap(path, filter_args, filter_bukti_setor),
+                "rekap_pajak_lengkap.xlsx",
+            )
+        return export_cache(
+            "rekap_pajak",
+            TABEL_EXPORT,
+            lambda path: tulis_excel_export(path, filter_args),
+            "rekap_pajak.xlsx",
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-        masukan = PpnMasukan.query.all()
-        keluaran = PpnKeluaran.query.all()
-        print("[DEBUG] Masukan:", len(masukan), "| Keluaran:", len(keluaran))
+def iter_baris_faktur(filter_args=None):
+    """Baris rekap (masukan lalu keluaran, urut id) yang lolos filter, dibaca bertahap dengan yield_per."""
+    filter_args = filter_args or {}
+    for nama, (model, jenis) in JENIS_EXPORT.items():
+        if filter_args.get("jenis") and nama != filter_args["jenis"]:
+            continue
+        stmt = db.select(
+            model.tanggal,
+            model.keterangan,
+            model.npwp_lawan_transaksi,
+            model.nama_lawan_transaksi,
+            model.no_faktur,
+            model.dpp,
+            model.ppn,
+        ).where(*kondisi_rentang(model.tanggal, filter_args.get("dari"), filter_args.get("sampai")))
+        if filter_args.get("npwp"):
+            stmt = stmt.where(model.npwp_lawan_transaksi == filter_args["npwp"])
+        stmt = stmt.order_by(model.id).execution_options(yield_per=EXPORT_YIELD_PER)
 
-        def serialize_row(row):
-            print(f"[DEBUG] Serialize: {row.id} | {row.no_faktur}")
+        for row in db.session.execute(stmt):
             dpp_val = float(row.dpp)
             ppn_val = float(row.ppn)
-            return [
+            yield [
                 row.tanggal.strftime("%Y-%m-%d"),
-                "PPN MASUKAN" if isinstance(row, PpnMasukan) else "PPN KELUARAN",
+                jenis,
                 row.keterangan,
                 row.npwp_lawan_transaksi,
                 row.nama_lawan_transaksi,
@@ -34,60 +99,26 @@ def generate_excel_export(db):
                 dpp_val + ppn_val,  # 👈 Tambahan di akhir
             ]
 
-        headers = [
-            "Tanggal",
-            "Jenis",
-            "Keterangan",
-            "NPWP Rekanan",
-            "Nama Rekanan",
-            "No Faktur",
-            "DPP",
-            "PPN",
-            "Jumlah (DPP + PPN)",
-        ]
-        for col, title in enumerate(headers, start=1):
-            cell = ws.cell(row=1, column=col, value=title)
-            cell.font = Font(bold=True)
-            cell.alignment = Alignment(horizontal="center", vertical="center")
+def tulis_excel_export(path, filter_args=None, streaming=None):
+    """
+    Tulis rekap faktur masukan + keluaran (setelah filter) ke path. Mode
+    streaming (EXPORT_STREAMING, default) memakai workbook write-only dengan
+    header dari rekap_template.xlsx; mode template mengisi template di memori.
+    """
+    if streaming is None:
+        streaming = current_app.config.get("EXPORT_STREAMING", True)
 
-        data_rows = []
-        for r in masukan + keluaran:
-            try:
-                data_rows.append(serialize_row(r))
-            except Exception as e:
-                print(f"[ERROR] Gagal serialize row ID={r.id}: {e}")
+    tulis = tulis_excel_stream if streaming else tulis_excel_template
+    jumlah = tulis(path, TEMPLATE_PATH, iter_baris_faktur(filter_args), KOLOM_ANGKA)
+    print(f"[DEBUG] Berhasil menyimpan {jumlah} baris ke file:", path)
 
-        # Load template
-        BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
-        template_path = os.path.join(BASE_DIR, "templates", "rekap_template.xlsx")
-        template_path = os.path.normpath(template_path)
-
-        wb = load_workbook(template_path)
-        ws = wb.active
-
-        start_row = 2  # Anggap data mulai dari baris ke-3
-        thin_border = Border(
-            left=Side(style="thin"),
-            right=Side(style="thin"),
-            top=Side(style="thin"),
-            bottom=Side(style="thin"),
-        )
-
-        for idx, row_data in enumerate(data_rows, start=start_row):
-            for col_index, value in enumerate(row_data, start=1):
-                cell = ws.cell(row=idx, column=col_index, value=value)
-                cell.alignment = Alignment(vertical="center")
-                cell.border = thin_border
-                if isinstance(value, (int, float)) and col_index in [7, 8, 9]:
-                    cell.number_format = "#,##0.00"
-
-        # Simpan ke file sementara
-        temp = tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx")
-        wb.save(temp.name)
-        print("[DEBUG] Berhasil menyimpan file:", temp.name)
-        return send_file(
-            temp.name, as_attachment=True, download_name="rekap_pajak.xlsx"
-        )
-
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+def tulis_excel_lengkap(path, filter_args, filter_bukti_setor):
+    """Satu workbook write-only: sheet faktur + sheet bukti setor, masing-masing dengan header templatenya."""
+    wb = Workbook(write_only=True)
+    jumlah_faktur = tambah_sheet(wb, TEMPLATE_PATH, iter_baris_faktur(filter_args), KOLOM_ANGKA, "Faktur PPN")
+    jumlah_setor = tambah_sheet(
+        wb, TEMPLATE_BUKTI_SETOR, iter_baris_bukti_setor(db, filter_bukti_setor),
+        KOLOM_ANGKA_BUKTI_SETOR, "Bukti Setor",
+    )
+    wb.save(path)
+    print(f"[DEBUG] Berhasil menyimpan {jumlah_faktur} faktur + {jumlah_setor} bukti setor ke file:", path)
@@ -1,9 +1,12 @@
 from flask import jsonify
 from datetime import datetime
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 from models import PpnMasukan, PpnKeluaran  # asumsi lo udah pindahin model ke models.py
+from shared_utils.db_utils import cari_yang_ada, insert_abaikan_duplikat
+from laporan.services import catat_faktur, tambah_ke_ringkasan
 
-def save_invoice_data(data, db):
+def siapkan_record(data):
+    """Validasi satu item payload → (model tujuan, dict kolom). ValueError jika tidak valid."""
     # langsung ambil jenis_pajak dari field eksplisit
     jenis_pajak = data.get("klasifikasi") or "PPN_KELUARAN"  # fallback default
 
@@ -16,29 +19,92 @@ def save_invoice_data(data, db):
         if field not in data:
             raise ValueError(f"Field '{field}' wajib diisi.")
 
+    # no_faktur dipakai sebagai kunci set/dict dan nilai query IN
+    if not isinstance(data["no_faktur"], str) or not data["no_faktur"].strip():
+        raise ValueError("Field 'no_faktur' harus berupa teks dan tidak boleh kosong.")
+
     try:
+        # Bukan string (angka/null dari JSON) → TypeError dari strptime
         tanggal_obj = datetime.strptime(data["tanggal"], "%Y-%m-%d").date()
-    except ValueError:
+    except (TypeError, ValueError):
         raise ValueError("Format tanggal tidak valid. Gunakan YYYY-MM-DD.")
 
+    try:
+        # Dibulatkan ke sen seperti kolom Numeric(15, 2), sama di semua database
+        dpp = Decimal(str(data["dpp"])).quantize(Decimal("0.01"), ROUND_HALF_UP)
+        ppn = Decimal(str(data["ppn"])).quantize(Decimal("0.01"), ROUND_HALF_UP)
+    except InvalidOperation:
+        raise ValueError("Nilai DPP/PPN harus berupa angka.")
+
     bulan_str = data.get("bulan") or tanggal_obj.strftime("%B")
     model_to_use = PpnMasukan if jenis_pajak == "PPN_MASUKAN" else PpnKeluaran
 
-    existing = db.session.execute(
-        db.select(model_to_use).filter_by(no_faktur=data["no_faktur"])
-    ).scalar_one_or_none()
-    if existing:
-        raise ValueError(f"Faktur '{data['no_faktur']}' sudah ada.")
-
-    record = model_to_use(
+    return model_to_use, dict(
         bulan=bulan_str,
         tanggal=tanggal_obj,
         keterangan=data["keterangan"],
         npwp_lawan_transaksi=data["npwp_lawan_transaksi"],
         nama_lawan_transaksi=data["nama_lawan_transaksi"],
         no_faktur=data["no_faktur"],
-        dpp=Decimal(str(data["dpp"])),
-        ppn=Decimal(str(data["ppn"])),
+        dpp=dpp,
+        ppn=ppn,
     )
 
-    db.session.add(record)
\ No newline at end of file
+def save_invoice_data(data, db):
+    model_to_use, values = siapkan_record(data)
+
+    existing = db.session.execute(
+        db.select(model_to_use).filter_by(no_faktur=values["no_faktur"])
+    ).scalar_one_or_none()
+    if existing:
+        raise ValueError(f"Faktur '{values['no_faktur']}' sudah ada.")
+
+    db.session.add(model_to_use(**values))
+    tambah_ke_ringkasan(catat_faktur({}, model_to_use, values["tanggal"], values["dpp"], values["ppn"]))
+
+def save_invoice_batch(items, db):
+    """
+    Simpan banyak faktur sekaligus: satu lookup duplikat (IN) dan satu bulk
+    insert per tabel. Item yang tidak valid atau duplikat tidak menggagalkan
+    item lain. Mengembalikan laporan per item sesuai urutan payload:
+    {"index", "no_faktur", "status": saved|duplicate|invalid, "error"?}.
+    Commit diserahkan ke pemanggil.
+    """
+    laporan = []
+    per_model = {}
+    deltas = {}
+    for index, data in enumerate(items):
+        no_faktur = data.get("no_faktur") if isinstance(data, dict) else None
+        laporan.append({"index": index, "no_faktur": no_faktur, "status": "invalid"})
+        try:
+            if not isinstance(data, dict):
+                raise ValueError("Item harus berupa objek JSON.")
+            model_to_use, values = siapkan_record(data)
+        except ValueError as ve:
+            laporan[index]["error"] = str(ve)
+            continue
+        per_model.setdefault(model_to_use, []).append((index, values))
+
+    for model_to_use, entri in per_model.items():
+        sudah_ada = cari_yang_ada(db, model_to_use, "no_faktur", [v["no_faktur"] for _, v in entri])
+
+        rows, pemilik = [], {}
+        for index, values in entri:
+            no_faktur = values["no_faktur"]
+            if no_faktur in sudah_ada or no_faktur in pemilik:
+                laporan[index].update(status="duplicate", error=f"Faktur '{no_faktur}' sudah ada.")
+                continue
+            pemilik[no_faktur] = (index, values)
+            rows.append(values)
+
+        masuk = insert_abaikan_duplikat(db, model_to_use, rows, "no_faktur")
+        for no_faktur, (index, values) in pemilik.items():
+            if no_faktur in masuk:
+                laporan[index]["status"] = "saved"
+                catat_faktur(deltas, model_to_use, values["tanggal"], values["dpp"], values["ppn"])
+            else:
+                # Tersimpan oleh request lain di antara lookup dan insert
+                laporan[index].update(status="duplicate", error=f"Faktur '{no_faktur}' sudah ada.")
+
+    tambah_ke_ringkasan(deltas)
+    return laporan
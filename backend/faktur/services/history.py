@@ -1,22 +1,144 @@
 # services/history.py
 
-from flask import jsonify
-from models import PpnMasukan, PpnKeluaran
+import json
+from flask import jsonify, request, Response, stream_with_context
+from sqlalchemy import or_, and_, literal, union_all
+from models import db, PpnMasukan, PpnKeluaran
+from shared_utils.db_utils import (
+    parse_limit,
+    parse_tanggal_param,
+    encode_cursor,
+    decode_cursor,
+)
+
+# Urutan riwayat: tanggal terbaru dulu; pada tanggal yang sama masukan lalu
+# keluaran, masing-masing id terbesar dulu. Cursor = (tanggal, jenis, id)
+# baris terakhir halaman sebelumnya.
+JENIS = {"masukan": (0, PpnMasukan), "keluaran": (1, PpnKeluaran)}
+
+# Jumlah baris yang diambil dari cursor database per batch pada mode stream
+STREAM_YIELD_PER = 500
+
+
+def _setelah_cursor(model, urutan, cursor):
+    """Kondisi keyset: baris model yang posisinya sesudah cursor."""
+    tanggal, jenis_cursor, id_cursor = cursor
+    urutan_cursor = JENIS[jenis_cursor][0]
+    if urutan > urutan_cursor:
+        return model.tanggal <= tanggal
+    if urutan < urutan_cursor:
+        return model.tanggal < tanggal
+    # Batas tanggal <= ditulis terpisah supaya index (tanggal, id) dipakai sebagai range scan
+    return and_(
+        model.tanggal <= tanggal,
+        or_(model.tanggal < tanggal, model.id < id_cursor),
+    )
+
+
+def _select_jenis(model, nama, urutan, filter_args, cursor):
+    """SELECT kolom riwayat satu tabel + jenis/urutan literal, dengan filter dan keyset."""
+    stmt = db.select(
+        model.id,
+        model.no_faktur,
+        model.nama_lawan_transaksi,
+        model.tanggal,
+        literal(nama).label("jenis"),
+        literal(urutan).label("urutan"),
+    )
+    if filter_args["dari"]:
+        stmt = stmt.where(model.tanggal >= filter_args["dari"])
+    if filter_args["sampai"]:
+        stmt = stmt.where(model.tanggal <= filter_args["sampai"])
+    if filter_args["npwp"]:
+        stmt = stmt.where(model.npwp_lawan_transaksi == filter_args["npwp"])
+    if filter_args["no_faktur"]:
+        stmt = stmt.where(model.no_faktur.startswith(filter_args["no_faktur"], autoescape=True))
+    if cursor:
+        stmt = stmt.where(_setelah_cursor(model, urutan, cursor))
+    return stmt
+
+
+def _query_jenis(model, nama, urutan, filter_args, cursor, limit):
+    stmt = _select_jenis(model, nama, urutan, filter_args, cursor)
+    stmt = stmt.order_by(model.tanggal.desc(), model.id.desc()).limit(limit)
+    return db.session.execute(stmt).all()
+
+
+def _serialize(row):
+    return {
+        "id": row.id,
+        "jenis": row.jenis,
+        "no_faktur": row.no_faktur,
+        "nama_lawan_transaksi": row.nama_lawan_transaksi,
+        "tanggal": row.tanggal.strftime("%Y-%m-%d"),
+    }
+
+
+def stream_history(jenis, filter_args, cursor):
+    """
+    Seluruh riwayat (setelah filter) sebagai NDJSON: satu UNION ALL atas kedua
+    tabel yang diurutkan di SQL, dibaca bertahap dengan yield_per sehingga
+    memori worker tidak bergantung pada jumlah baris.
+    """
+    selects = [
+        _select_jenis(model, nama, urutan, filter_args, cursor)
+        for nama, (urutan, model) in JENIS.items()
+        if not jenis or nama == jenis
+    ]
+    gabungan = union_all(*selects).subquery()
+    stmt = (
+        db.select(gabungan)
+        .order_by(gabungan.c.tanggal.desc(), gabungan.c.urutan, gabungan.c.id.desc())
+        .execution_options(yield_per=STREAM_YIELD_PER)
+    )
+
+    def generate():
+        for row in db.session.execute(stmt):
+            yield json.dumps(_serialize(row)) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
 
 def get_history():
-    masukan = PpnMasukan.query.all()
-    keluaran = PpnKeluaran.query.all()
-
-    def serialize(row, jenis):
-        return {
-            "id": row.id,
-            "jenis": jenis,
-            "no_faktur": row.no_faktur,
-            "nama_lawan_transaksi": row.nama_lawan_transaksi,
-            "tanggal": row.tanggal.strftime("%Y-%m-%d"),
+    """
+    GET /api/history?limit=&cursor=&jenis=masukan|keluaran&dari=&sampai=&npwp=&no_faktur=
+    Satu halaman riwayat faktur (keyset pagination). next_cursor bernilai
+    null jika sudah halaman terakhir. Dengan ?format=ndjson seluruh hasil
+    filter (mulai dari cursor, tanpa limit) di-stream per baris.
+    """
+    args = request.args
+    try:
+        limit = parse_limit(args.get("limit"))
+        jenis = args.get("jenis") or None
+        if jenis and jenis not in JENIS:
+            raise ValueError("Parameter 'jenis' harus 'masukan' atau 'keluaran'.")
+        filter_args = {
+            "dari": parse_tanggal_param(args.get("dari"), "dari"),
+            "sampai": parse_tanggal_param(args.get("sampai"), "sampai"),
+            "npwp": args.get("npwp") or None,
+            "no_faktur": args.get("no_faktur") or None,
         }
+        cursor = decode_cursor(args["cursor"], 3) if args.get("cursor") else None
+        if cursor and cursor[1] not in JENIS:
+            raise ValueError("Parameter 'cursor' tidak valid.")
+    except ValueError as ve:
+        return jsonify(error=str(ve)), 400
 
-    hasil = [serialize(r, "masukan") for r in masukan] + [
-        serialize(r, "keluaran") for r in keluaran
-    ]
-    return jsonify(hasil), 200
+    if args.get("format") == "ndjson":
+        return stream_history(jenis, filter_args, cursor)
+
+    # limit + 1 baris per tabel cukup untuk menggabungkan dua urutan dan tahu masih ada halaman berikutnya
+    baris = []
+    for nama, (urutan, model) in JENIS.items():
+        if jenis and nama != jenis:
+            continue
+        baris.extend(_query_jenis(model, nama, urutan, filter_args, cursor, limit + 1))
+    baris.sort(key=lambda row: (-row.tanggal.toordinal(), row.urutan, -row.id))
+
+    halaman = baris[:limit]
+    next_cursor = None
+    if len(baris) > limit:
+        row = halaman[-1]
+        next_cursor = encode_cursor(row.tanggal, row.jenis, row.id)
+
+    return jsonify(data=[_serialize(row) for row in halaman], next_cursor=next_cursor, limit=limit), 200
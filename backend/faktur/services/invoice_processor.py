@@ -1,149 +1,380 @@
 import os
+import atexit
+import threading
 import traceback
 import cv2
 import json
 import numpy as np
-import pytesseract
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from flask import jsonify
-from pdf2image import convert_from_path
 from PIL import Image
 from faktur.utils import (
     extract_faktur_tanggal, extract_jenis_pajak,
     extract_npwp_nama_rekanan, extract_dpp,
-    extract_ppn, extract_keterangan
+    extract_ppn, extract_keterangan, ocr_layout, DokumenFaktur
 )
+from faktur.utils.ocr_backend import image_to_string, backend_tersedia
 from shared_utils.file_utils import allowed_file
-from bukti_setor.utils.helpers import preprocess_for_ocr, simpan_preview_image
+from shared_utils.job_queue import get_job_queue
+from shared_utils.pdf_utils import (
+    hitung_halaman_pdf, iter_halaman_pdf, opsi_rasterisasi,
+    ekstrak_text_layer, punya_text_layer,
+)
+from bukti_setor.utils.helpers import simpan_preview_image
+from .ocr_cache import OcrCache, get_ocr_cache
 
+OCR_LANG = "ind"
+OCR_CONFIG = "--psm 6"
 
-def process_invoice_file(request, config):
+# Satu process pool OCR per proses, dibuat saat pertama dibutuhkan dan dipakai
+# bersama oleh semua request, thread job, dan thread batch; jumlah proses OCR
+# per worker gunicorn tidak pernah melebihi OCR_WORKERS.
+_ocr_pool = None
+_ocr_pool_lock = threading.Lock()
+
+
+def get_ocr_pool(workers):
+    """ProcessPoolExecutor bersama berukuran workers (ukuran dari pemanggil pertama)."""
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is None:
+            _ocr_pool = ProcessPoolExecutor(max_workers=workers)
+            print(f"[⚙️ OCR POOL] Process pool dibuat dengan {workers} worker")
+        return _ocr_pool
+
+
+def _buang_ocr_pool(pool):
+    """Lepas pool yang rusak (proses anak mati) supaya pemanggil berikutnya membuat yang baru."""
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is pool:
+            _ocr_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+@atexit.register
+def _tutup_ocr_pool():
+    with _ocr_pool_lock:
+        if _ocr_pool is not None:
+            _ocr_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _validasi_upload(request):
+    """Mengembalikan (file, nama_pt_utama, None) atau (None, None, response_error)."""
     if "file" not in request.files:
-        return jsonify(error="File tidak ditemukan"), 400
+        return None, None, (jsonify(error="File tidak ditemukan"), 400)
 
     file = request.files["file"]
     nama_pt_utama = request.form.get("nama_pt_utama", "").strip()
 
     if not nama_pt_utama:
-        return jsonify(error="Nama PT Utama wajib diisi"), 400
+        return None, None, (jsonify(error="Nama PT Utama wajib diisi"), 400)
 
     if not allowed_file(file.filename):
-        return jsonify(error="File tidak didukung. Gunakan PDF atau gambar"), 400
+        return None, None, (jsonify(error="File tidak didukung. Gunakan PDF atau gambar"), 400)
+
+    return file, nama_pt_utama, None
+
+
+def process_invoice_file(request, config):
+    file, nama_pt_utama, error = _validasi_upload(request)
+    if error:
+        return error
 
     filepath = os.path.join(config['UPLOAD_FOLDER'], file.filename)
     file.save(filepath)
 
     try:
-        if file.filename.lower().endswith(".pdf"):
-            images = convert_from_path(filepath, poppler_path="C:\\poppler\\poppler-24.08.0\\Library\\bin")
-        else:
-            with Image.open(filepath) as img:
-                images = [img.copy()]  # salinan aman
+        hasil = proses_faktur(filepath, file.filename, nama_pt_utama, config)
+        return jsonify({"success": True, **hasil}), 200
+
+    except Exception as err:
+        print(f"[❌ ERROR] {traceback.format_exc()}")
+        return jsonify(error=traceback.format_exc()), 500
 
-        hasil_semua_halaman = []
+    finally:
+        if os.path.exists(filepath):
+            os.remove(filepath)
 
-        for i, image in enumerate(images):
-            halaman_ke = i + 1
-            print(f"\n=== [📝 DEBUG] MEMPROSES HALAMAN {halaman_ke} ===")
 
-            if isinstance(image, np.ndarray):
-                img_cv = image
-            else:
-                img_cv = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+def submit_invoice_job(request, config):
+    """Versi asinkron /api/process: simpan file, daftarkan job, langsung balas job_id."""
+    file, nama_pt_utama, error = _validasi_upload(request)
+    if error:
+        return error
 
-            thresh = preprocess_for_ocr(img_cv)
+    # Nama unik supaya upload paralel dengan nama file sama tidak saling menimpa
+    filepath = os.path.join(config['UPLOAD_FOLDER'], f"job_{uuid.uuid4().hex}_{file.filename}")
+    file.save(filepath)
 
+    job_id = get_job_queue().submit(
+        "faktur", _proses_faktur_job, filepath, file.filename, nama_pt_utama, config,
+        file_input=filepath,
+    )
+    return jsonify(job_id=job_id, status="queued", status_url=f"/api/jobs/{job_id}"), 202
+
+
+def _proses_faktur_job(filepath, filename, nama_pt_utama, config, on_halaman=None):
+    try:
+        return proses_faktur(filepath, filename, nama_pt_utama, config, on_halaman=on_halaman)
+    finally:
+        if os.path.exists(filepath):
+            os.remove(filepath)
+
+
+def proses_faktur(filepath, filename, nama_pt_utama, config, on_halaman=None):
+    """
+    Inti pemrosesan file faktur (PDF/gambar) yang sudah tersimpan di disk.
+    on_halaman(hasil_halaman) dipanggil setiap satu halaman selesai.
+    """
+    text_layer = []
+    if filename.lower().endswith(".pdf"):
+        poppler_path = config.get("POPPLER_PATH")
+        total_halaman = hitung_halaman_pdf(filepath, poppler_path)
+        halaman_iter = iter_halaman_pdf(
+            filepath, poppler_path, total_halaman=total_halaman,
+            **opsi_rasterisasi(config)
+        )
+        # e-Faktur digital sudah punya text layer, halaman seperti ini tidak perlu OCR
+        if config.get("PDF_TEXT_LAYER", True):
+            text_layer = ekstrak_text_layer(filepath, poppler_path)
+    else:
+        with Image.open(filepath) as img:
+            total_halaman = 1
+            halaman_iter = iter([(1, img.copy())])  # salinan aman
+
+    min_chars = int(config.get("TEXT_LAYER_MIN_CHARS", 100))
+    opsi_ocr = {
+        "mode": config.get("FAKTUR_OCR_MODE", "full"),
+        "backend": config.get("OCR_BACKEND", "pytesseract"),
+    }
+    if not backend_tersedia(opsi_ocr["backend"]):
+        print(f"[⚠️ OCR] Backend {opsi_ocr['backend']} tidak tersedia, memakai pytesseract")
+        opsi_ocr["backend"] = "pytesseract"
+    ocr_cache = get_ocr_cache(config)
+    kunci_cache = {}
+    sumber_teks = {}
+
+    def buat_tugas():
+        # Dibuat lazy: halaman dirender satu per satu sesuai laju pemrosesan
+        for halaman_ke, image in halaman_iter:
             preview_filename = simpan_preview_image(
                 pil_image=image,
                 upload_folder=config['UPLOAD_FOLDER'],
                 page_num=halaman_ke,
-                original_filename=file.filename
+                original_filename=filename
             )
 
-            raw_text = pytesseract.image_to_string(img_cv, lang="ind", config="--psm 6")
-            no_faktur, tanggal_obj = extract_faktur_tanggal(raw_text)
-
-            jenis_pajak, blok_rekanan, _ = extract_jenis_pajak(raw_text, nama_pt_utama)
-            if not jenis_pajak:
-                hasil_semua_halaman.append(
-                    {"error": f"Hal {halaman_ke}: Nama PT Utama tidak ditemukan."}
-                )
-                continue
-
-            nama_rekanan, npwp_rekanan = extract_npwp_nama_rekanan(blok_rekanan)
-            if not no_faktur:
-                hasil_semua_halaman.append(
-                    {"error": f"Hal {halaman_ke}: Tidak ditemukan tanggal/faktur"}
-                )
-                continue
-
-            dpp, dpp_str, override_ppn, override_ppn_str = extract_dpp(raw_text)
-            ppn, ppn_str = extract_ppn(raw_text, dpp, override_ppn)
-            keterangan = extract_keterangan(raw_text)
-
-            hasil_halaman = {
-                "klasifikasi": jenis_pajak,
-                "data": {
-                    # GUNAKAN KONDISI INI: Jika tanggal_obj ada, format. Jika tidak, beri string kosong.
-                    "bulan": tanggal_obj.strftime("%B") if tanggal_obj else "",
-                    "tanggal": tanggal_obj.strftime("%Y-%m-%d") if tanggal_obj else "",
-                    "keterangan": keterangan,
-                    "npwp_lawan_transaksi": npwp_rekanan,
-                    "nama_lawan_transaksi": nama_rekanan,
-                    "no_faktur": no_faktur,
-                    "dpp": dpp,
-                    "dpp_str": dpp_str,
-                    "ppn": ppn,
-                    "ppn_str": ppn_str,
-                    "formatted_dpp": dpp_str,
-                    "formatted_ppn": ppn_str,
-                    "halaman": halaman_ke,
-                    "preview_image": preview_filename,
-                    "raw_ocr": raw_text,
-                },
-            }
-
-            if not tanggal_obj:
-                hasil_halaman["warning_message"] = (
-                    "Tanggal tidak terdeteksi, mohon isi manual."
-                )
-
-            hasil_semua_halaman.append(hasil_halaman)
-
-            # Simpan debug JSON dan TXT
-            debug_dir = os.path.join(config['UPLOAD_FOLDER'], "debug")
-            os.makedirs(debug_dir, exist_ok=True)
-            json_path = os.path.join(
-                debug_dir, f"{os.path.splitext(file.filename)[0]}_hal_{halaman_ke}.json"
-            )
-            txt_path = os.path.join(debug_dir, f"debug_page_{halaman_ke}.txt")
+            cached_teks = None
+            sumber_teks[halaman_ke] = "ocr"
+            if halaman_ke <= len(text_layer) and punya_text_layer(text_layer[halaman_ke - 1], min_chars):
+                cached_teks = {"raw_text": text_layer[halaman_ke - 1]}
+                sumber_teks[halaman_ke] = "text_layer"
+                print(f"[⚡ TEXT LAYER] Halaman {halaman_ke} memakai teks bawaan PDF")
 
-            with open(json_path, "w", encoding="utf-8") as f:
-                json.dump(hasil_halaman, f, ensure_ascii=False, indent=2)
-            with open(txt_path, "w", encoding="utf-8") as f:
-                f.write(raw_text)
+            # Halaman yang teks OCR-nya sudah ada di cache cukup menjalankan ekstraksi
+            elif ocr_cache:
+                kunci = OcrCache.buat_kunci(image, OCR_LANG, f"{OCR_CONFIG}|{opsi_ocr['mode']}|{opsi_ocr['backend']}")
+                cached_teks = ocr_cache.get(kunci)
+                if cached_teks is None:
+                    kunci_cache[halaman_ke] = kunci
+                else:
+                    sumber_teks[halaman_ke] = "ocr_cache"
+                    print(f"[⚡ OCR CACHE] Halaman {halaman_ke} diambil dari cache")
 
-            print(
-                f"[✅ HALAMAN {halaman_ke}] Faktur: {no_faktur} | DPP: {dpp_str} | PPN: {ppn_str}"
+            yield (
+                None if cached_teks is not None else image,
+                halaman_ke, nama_pt_utama, preview_filename, cached_teks, opsi_ocr,
             )
 
-            print("[DEBUG] Hasil halaman ke", halaman_ke)
-            print(json.dumps(hasil_semua_halaman[-1], indent=2, ensure_ascii=False))
-
-        return (
-            jsonify(
-                {
-                    "success": True,
-                    "results": hasil_semua_halaman,
-                    "total_halaman": len(images),
-                }
-            ),
-            200,
+    ukuran_pool = max(1, int(config.get("OCR_WORKERS", 1)))
+    workers = min(ukuran_pool, total_halaman)
+    hasil_semua_halaman = []
+
+    for halaman_ke, (hasil_halaman, teks) in _jalankan_semua_halaman(buat_tugas(), workers, ukuran_pool):
+        hasil_halaman["sumber_teks"] = sumber_teks.get(halaman_ke, "ocr")
+        hasil_semua_halaman.append(hasil_halaman)
+        if on_halaman:
+            on_halaman(hasil_halaman)
+        kunci = kunci_cache.pop(halaman_ke, None)
+        if teks and kunci:
+            ocr_cache.set(kunci, teks)
+        if "data" not in hasil_halaman:
+            continue
+
+        # Simpan debug JSON dan TXT
+        debug_dir = os.path.join(config['UPLOAD_FOLDER'], "debug")
+        os.makedirs(debug_dir, exist_ok=True)
+        json_path = os.path.join(
+            debug_dir, f"{os.path.splitext(filename)[0]}_hal_{halaman_ke}.json"
         )
+        txt_path = os.path.join(debug_dir, f"debug_page_{halaman_ke}.txt")
 
-    except Exception as err:
-        print(f"[❌ ERROR] {traceback.format_exc()}")
-        return jsonify(error=traceback.format_exc()), 500
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(hasil_halaman, f, ensure_ascii=False, indent=2)
+        with open(txt_path, "w", encoding="utf-8") as f:
+            f.write(teks["raw_text"])
+
+        print("[DEBUG] Hasil halaman ke", halaman_ke)
+        print(json.dumps(hasil_halaman, indent=2, ensure_ascii=False))
+
+    return {
+        "results": hasil_semua_halaman,
+        "total_halaman": total_halaman,
+        "ocr_cache": ocr_cache.stats() if ocr_cache else None,
+        "sumber_teks": {
+            sumber: list(sumber_teks.values()).count(sumber)
+            for sumber in ("text_layer", "ocr_cache", "ocr")
+        },
+    }
+
+
+def _jalankan_semua_halaman(tugas, workers, ukuran_pool=None):
+    """
+    Menjalankan _proses_halaman untuk setiap tugas dan menghasilkan
+    (halaman_ke, (hasil_halaman, teks)) sesuai urutan halaman.
+    Jika workers > 1, halaman diproses paralel di process pool bersama
+    (get_ocr_pool, ukuran_pool proses) dengan paling banyak 2 x workers
+    halaman dari request ini di antrean, supaya memori tetap datar.
+    Error di satu halaman hanya menjadi entri error untuk halaman itu.
+    """
+    if workers <= 1:
+        for args in tugas:
+            yield args[1], _proses_halaman_aman(*args)
+        return
 
+    pool = get_ocr_pool(ukuran_pool or workers)
+    antrean = deque()
+    try:
+        for args in tugas:
+            try:
+                future = pool.submit(_proses_halaman, *args)
+            except BrokenProcessPool:
+                # Proses anak mati di request sebelumnya: ganti pool, coba sekali lagi
+                _buang_ocr_pool(pool)
+                pool = get_ocr_pool(ukuran_pool or workers)
+                future = pool.submit(_proses_halaman, *args)
+            antrean.append((args[1], future))
+            if len(antrean) >= workers * 2:
+                yield _ambil_hasil(*antrean.popleft())
+        while antrean:
+            yield _ambil_hasil(*antrean.popleft())
     finally:
-        if os.path.exists(filepath):
-            os.remove(filepath)
+        # Request berhenti di tengah (generator ditutup): jangan tinggalkan halaman di pool
+        for _, future in antrean:
+            future.cancel()
+
+
+def _ambil_hasil(halaman_ke, future):
+    try:
+        return halaman_ke, future.result()
+    except Exception as e:
+        print(f"[❌ ERROR HALAMAN {halaman_ke}] {e}")
+        return halaman_ke, ({"error": f"Hal {halaman_ke}: Gagal diproses ({e})"}, None)
+
+
+def _proses_halaman_aman(image, halaman_ke, nama_pt_utama, preview_filename, teks=None, opsi_ocr=None):
+    try:
+        return _proses_halaman(image, halaman_ke, nama_pt_utama, preview_filename, teks, opsi_ocr)
+    except Exception as e:
+        print(f"[❌ ERROR HALAMAN {halaman_ke}] {traceback.format_exc()}")
+        return {"error": f"Hal {halaman_ke}: Gagal diproses ({e})"}, None
+
+
+def _ocr_halaman(image, opsi_ocr):
+    """OCR satu halaman. Mengembalikan {"raw_text": ..., "roi": {...}}."""
+    if isinstance(image, np.ndarray):
+        img_cv = image
+    else:
+        arr = np.array(image)
+        # Halaman hasil rasterisasi grayscale berbentuk 2D
+        img_cv = cv2.cvtColor(arr, cv2.COLOR_GRAY2BGR if arr.ndim == 2 else cv2.COLOR_RGB2BGR)
+
+    if opsi_ocr["mode"] == "layout":
+        return ocr_layout(img_cv, OCR_LANG, OCR_CONFIG, backend=opsi_ocr["backend"])
+
+    raw_text = image_to_string(img_cv, OCR_LANG, OCR_CONFIG, backend=opsi_ocr["backend"])
+    return {"raw_text": raw_text, "roi": {}}
+
+
+def _proses_halaman(image, halaman_ke, nama_pt_utama, preview_filename, teks=None, opsi_ocr=None):
+    """
+    Preprocessing, OCR, dan ekstraksi satu halaman faktur.
+    Jika teks sudah diberikan (text layer PDF atau hit cache OCR), preprocessing
+    dan OCR dilewati. Pada mode "layout", teks region (roi) dipakai lebih dulu
+    dan teks halaman penuh menjadi fallback.
+    Tidak memakai app context Flask supaya bisa dijalankan di proses worker.
+    """
+    print(f"\n=== [📝 DEBUG] MEMPROSES HALAMAN {halaman_ke} ===")
+
+    if teks is None:
+        teks = _ocr_halaman(image, opsi_ocr or {"mode": "full", "backend": "pytesseract"})
+    raw_text = teks["raw_text"]
+    roi = teks.get("roi") or {}
+    # Teks halaman di-parse sekali lalu dipakai bersama oleh semua ekstraktor
+    doc = DokumenFaktur(raw_text)
+
+    no_faktur, tanggal_obj = extract_faktur_tanggal(doc)
+    if roi.get("nomor_seri"):
+        no_faktur = extract_faktur_tanggal(roi["nomor_seri"])[0] or no_faktur
+    if roi.get("tanggal"):
+        tanggal_obj = extract_faktur_tanggal(roi["tanggal"])[1] or tanggal_obj
+
+    jenis_pajak, blok_rekanan, _ = extract_jenis_pajak(doc, nama_pt_utama)
+    if not jenis_pajak:
+        return {"error": f"Hal {halaman_ke}: Nama PT Utama tidak ditemukan."}, teks
+
+    nama_rekanan, npwp_rekanan = extract_npwp_nama_rekanan(blok_rekanan)
+    blok_roi = roi.get("penjual" if jenis_pajak == "PPN_MASUKAN" else "pembeli")
+    if blok_roi:
+        nama_roi, npwp_roi = extract_npwp_nama_rekanan(blok_roi)
+        if nama_roi != "Tidak Ditemukan":
+            nama_rekanan = nama_roi
+        if npwp_roi != "Tidak Ditemukan":
+            npwp_rekanan = npwp_roi
+
+    if not no_faktur:
+        return {"error": f"Hal {halaman_ke}: Tidak ditemukan tanggal/faktur"}, teks
+
+    dpp = 0.0
+    if roi.get("dpp"):
+        dpp, dpp_str, override_ppn, override_ppn_str = extract_dpp(roi["dpp"])
+    if not dpp:
+        dpp, dpp_str, override_ppn, override_ppn_str = extract_dpp(doc)
+    ppn, ppn_str = extract_ppn(roi.get("ppn") or doc, dpp, override_ppn)
+    keterangan = extract_keterangan(doc)
+
+    hasil_halaman = {
+        "klasifikasi": jenis_pajak,
+        "data": {
+            # GUNAKAN KONDISI INI: Jika tanggal_obj ada, format. Jika tidak, beri string kosong.
+            "bulan": tanggal_obj.strftime("%B") if tanggal_obj else "",
+            "tanggal": tanggal_obj.strftime("%Y-%m-%d") if tanggal_obj else "",
+            "keterangan": keterangan,
+            "npwp_lawan_transaksi": npwp_rekanan,
+            "nama_lawan_transaksi": nama_rekanan,
+            "no_faktur": no_faktur,
+            "dpp": dpp,
+            "dpp_str": dpp_str,
+            "ppn": ppn,
+            "ppn_str": ppn_str,
+            "formatted_dpp": dpp_str,
+            "formatted_ppn": ppn_str,
+            "halaman": halaman_ke,
+            "preview_image": preview_filename,
+            "raw_ocr": raw_text,
+        },
+    }
+
+    if not tanggal_obj:
+        hasil_halaman["warning_message"] = (
+            "Tanggal tidak terdeteksi, mohon isi manual."
+        )
+
+    print(
+        f"[✅ HALAMAN {halaman_ke}] Faktur: {no_faktur} | DPP: {dpp_str} | PPN: {ppn_str}"
+    )
+    return hasil_halaman, teks
@@ -0,0 +1,129 @@
+# faktur/services/ocr_cache.py
+
+import os
+import json
+import hashlib
+import threading
+import numpy as np
+
+CACHE_VERSION = "v2"
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+class OcrCache:
+    """
+    Cache hasil OCR di disk, dikunci dengan hash piksel halaman + konfigurasi OCR.
+    Nilai yang disimpan berupa dict JSON ({"raw_text": ..., "roi": {...}}).
+    Ukuran total dibatasi max_bytes; file yang paling lama tidak dipakai
+    (mtime paling tua) dibuang lebih dulu (LRU).
+    """
+
+    def __init__(self, folder, max_bytes):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.folder, exist_ok=True)
+        self._total_bytes = sum(size for _, _, size in self._scan())
+
+    @staticmethod
+    def buat_kunci(image, lang, config):
+        arr = image if isinstance(image, np.ndarray) else np.asarray(image)
+        h = hashlib.blake2b(digest_size=20)
+        h.update(f"{CACHE_VERSION}|{lang}|{config}|{arr.shape}|{arr.dtype}".encode())
+        h.update(np.ascontiguousarray(arr).tobytes())
+        return h.hexdigest()
+
+    def _path(self, kunci):
+        return os.path.join(self.folder, kunci[:2], f"{kunci}.json")
+
+    def get(self, kunci):
+        path = self._path(kunci)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                teks = json.load(f)
+            os.utime(path)  # tandai baru dipakai untuk LRU
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return teks
+
+    def set(self, kunci, teks):
+        path = self._path(kunci)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(teks, f, ensure_ascii=False)
+        ukuran_baru = os.path.getsize(tmp_path)
+        try:
+            # Kunci yang ditimpa: yang bertambah hanya selisih ukurannya
+            ukuran_lama = os.path.getsize(path)
+        except OSError:
+            ukuran_lama = 0
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._total_bytes += ukuran_baru - ukuran_lama
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _scan(self):
+        for root, _, files in os.walk(self.folder):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                yield path, st.st_mtime, st.st_size
+
+    def _evict(self):
+        # Hitung ulang dari disk karena worker lain bisa ikut menulis ke folder yang sama
+        entries = sorted(self._scan(), key=lambda e: e[1])
+        total = sum(size for _, _, size in entries)
+        target = int(self.max_bytes * 0.9)
+        for path, _, size in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._total_bytes = total
+        print(f"[🧹 OCR CACHE] Eviction selesai, ukuran sekarang {total / 1024:.1f} KB")
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "size_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+def get_ocr_cache(config):
+    """Instance OcrCache per folder upload, atau None jika cache dimatikan."""
+    if not config.get("OCR_CACHE_ENABLED", True):
+        return None
+
+    folder = os.path.join(config["UPLOAD_FOLDER"], "ocr_cache")
+    max_bytes = int(config.get("OCR_CACHE_MAX_MB", 200)) * 1024 * 1024
+    with _instances_lock:
+        cache = _instances.get(folder)
+        if cache is None:
+            cache = OcrCache(folder, max_bytes)
+            _instances[folder] = cache
+        return cache
@@ -8,9 +8,11 @@ from .preprocessing import (
     preprocess_for_ocr,
     simpan_preview_image
 )
+from .layout import ocr_layout
 
 # Import semua dari extraction
 from .extraction import (
+    DokumenFaktur,
     extract_faktur_tanggal,
     extract_jenis_pajak,
     extract_npwp_nama_rekanan,
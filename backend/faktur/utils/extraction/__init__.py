@@ -1,5 +1,6 @@
 # utils/extraction/__init__.py
 
+from .dokumen import DokumenFaktur
 from .faktur_tanggal import extract_faktur_tanggal
 from .jenis_pajak import extract_jenis_pajak
 from .npwp_nama import extract_npwp_nama_rekanan
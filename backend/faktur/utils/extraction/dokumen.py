@@ -0,0 +1,104 @@
+# utils/extraction/dokumen.py
+
+import re
+from functools import cached_property
+from shared_utils.text_utils import clean_number, clean_string
+from shared_utils.date_utils import cari_tanggal_bulan
+
+# Kata kunci yang dicari ekstraktor; posisi barisnya diindeks sekali per halaman
+KATA_KUNCI = (
+    "dasar pengenaan pajak",
+    "harga jual",
+    "penggantian",
+    "keterangan",
+    "ppnbm",
+    "pasal",
+    "npwp",
+    "nitku",
+    "nama",
+    "ppn",
+    "uu",
+)
+
+POLA_ANGKA = re.compile(r"[\d.,]+")
+POLA_ANGKA_BESAR = re.compile(r"[\d.]{1,3}(?:[.,]\d{3}){2,}")
+POLA_FAKTUR = re.compile(
+    r"0[0-9a-zA-Z]{2}[-.\s]?[0-9a-zA-Z]{3}[-.\s]?[0-9a-zA-Z]{2}[-.\s]?[0-9a-zA-Z]{8,}",
+    re.IGNORECASE,
+)
+POLA_TANGGAL_DMY = re.compile(r"(\d{1,2})[/-](\d{1,2})[/-](\d{4})")
+POLA_TANGGAL_YMD = re.compile(r"(\d{4})[/-](\d{1,2})[/-](\d{1,2})")
+
+
+class DokumenFaktur:
+    """
+    Hasil parsing teks OCR satu halaman yang dipakai bersama oleh semua
+    ekstraktor: baris asli dan lowercase, indeks kata kunci → nomor baris,
+    token angka per baris yang sudah melewati clean_number, serta kandidat
+    nomor faktur, tanggal, dan NPWP. Baris dan indeks dibangun saat objek
+    dibuat; sisanya dihitung sekali saat pertama dibutuhkan lalu disimpan.
+    """
+
+    def __init__(self, raw_text):
+        self.raw_text = raw_text or ""
+        self.lines = self.raw_text.splitlines()
+        self.lower = [line.lower() for line in self.lines]
+
+        self.index = {kata: [] for kata in KATA_KUNCI}
+        for i, line in enumerate(self.lower):
+            for kata in KATA_KUNCI:
+                if kata in line:
+                    self.index[kata].append(i)
+
+        self._angka = {}
+
+    @classmethod
+    def dari(cls, teks):
+        """Terima str atau DokumenFaktur, selalu kembalikan DokumenFaktur."""
+        return teks if isinstance(teks, cls) else cls(teks)
+
+    def baris_dengan(self, kata):
+        """Nomor baris yang mengandung kata kunci (lihat KATA_KUNCI)."""
+        return self.index[kata]
+
+    def angka(self, i):
+        """[(token, nilai)] angka di baris ke-i, urut sesuai kemunculan."""
+        hasil = self._angka.get(i)
+        if hasil is None:
+            hasil = [(token, clean_number(token)) for token in POLA_ANGKA.findall(self.lines[i])]
+            self._angka[i] = hasil
+        return hasil
+
+    @cached_property
+    def angka_besar(self):
+        return [clean_number(n) for n in POLA_ANGKA_BESAR.findall(self.raw_text)]
+
+    @cached_property
+    def kandidat_faktur(self):
+        return POLA_FAKTUR.findall(self.raw_text)
+
+    @cached_property
+    def kandidat_tanggal(self):
+        """
+        (hari, bulan, tahun) dari tanggal bernama bulan. Nama bulan yang persis
+        dikenali diutamakan; pencocokan fuzzy hanya jika tidak ada satu pun.
+        """
+        return cari_tanggal_bulan(self.raw_text, fuzzy=False) or cari_tanggal_bulan(self.raw_text)
+
+    @cached_property
+    def tanggal_dmy(self):
+        return POLA_TANGGAL_DMY.search(self.raw_text)
+
+    @cached_property
+    def tanggal_ymd(self):
+        return POLA_TANGGAL_YMD.search(self.raw_text)
+
+    @cached_property
+    def kandidat_npwp(self):
+        """(nomor_baris, digit) untuk setiap baris berlabel NPWP."""
+        return [(i, re.sub(r"\D", "", self.lines[i])) for i in self.index["npwp"]]
+
+    @cached_property
+    def bersih(self):
+        """clean_string per baris."""
+        return [clean_string(line) for line in self.lines]
@@ -1,27 +1,22 @@
-import re
-from shared_utils.text_utils import clean_number, format_currency
+from shared_utils.text_utils import format_currency
+from .dokumen import DokumenFaktur
 
 def extract_dpp(raw_text):
     try:
+        doc = DokumenFaktur.dari(raw_text)
         dpp = 0.0
         dpp_line = ""
 
-        lines = raw_text.splitlines()
-        for line in lines:
-            if "dasar pengenaan pajak" in line.lower():
-                numbers = re.findall(r"[\d.,]+", line)
-                if numbers:
-                    last_number = numbers[-1]
-                    dpp = clean_number(last_number)
-                    dpp_line = line
-                    print(f"[✅ DPP dari baris] {dpp:,.2f} ← {line}")
-                    break
+        for i in doc.baris_dengan("dasar pengenaan pajak"):
+            numbers = doc.angka(i)
+            if numbers:
+                dpp = numbers[-1][1]
+                dpp_line = doc.lines[i]
+                print(f"[✅ DPP dari baris] {dpp:,.2f} ← {dpp_line}")
+                break
 
         # Ambil semua angka besar
-        all_numbers = re.findall(r"[\d.]{1,3}(?:[.,]\d{3}){2,}", raw_text)
-        candidates = [
-            clean_number(n) for n in all_numbers if clean_number(n) > 10_000_000
-        ]
+        candidates = [n for n in doc.angka_besar if n > 10_000_000]
 
         if dpp > 0:
             # Jika ada kandidat yang terlalu jauh dari DPP, abaikan override
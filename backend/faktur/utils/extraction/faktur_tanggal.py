@@ -1,10 +1,11 @@
 import re
 from datetime import datetime
+from shared_utils.date_utils import buat_tanggal
+from .dokumen import DokumenFaktur
 
 def extract_faktur_tanggal(raw_text):
-    import re
-    from datetime import datetime
-
+    doc = DokumenFaktur.dari(raw_text)
+    raw_text = doc.raw_text
     no_faktur = None
     tanggal_obj = None
 
@@ -13,24 +14,21 @@ def extract_faktur_tanggal(raw_text):
     print("--------------------------------------")
 
     # 1. Cari semua teks yang polanya mirip nomor faktur di seluruh dokumen.
-    tolerant_pattern = r"0[0-9a-zA-Z]{2}[-.\s]?[0-9a-zA-Z]{3}[-.\s]?[0-9a-zA-Z]{2}[-.\s]?[0-9a-zA-Z]{8,}"
-    all_candidates = re.findall(tolerant_pattern, raw_text, re.IGNORECASE)
+    all_candidates = doc.kandidat_faktur
     print(f"[DEBUG] Semua kandidat ditemukan: {all_candidates}")
 
     valid_candidates = []
     if all_candidates:
-        lines = raw_text.splitlines()
+        # Cukup periksa baris NPWP/NITKU dari indeks, bukan semua baris
+        baris_npwp = [
+            doc.lines[i] for i in sorted(set(doc.baris_dengan("npwp") + doc.baris_dengan("nitku")))
+        ]
         for cand in all_candidates:
-            is_npwp = False
-            for line in lines:
-                if cand in line:
-                    if "npwp" in line.lower() or "nitku" in line.lower():
-                        is_npwp = True
-                        print(
-                            f"[DEBUG] Kandidat '{cand}' dibuang karena berada di baris NPWP/NITKU."
-                        )
-                        break
-            if not is_npwp:
+            if any(cand in line for line in baris_npwp):
+                print(
+                    f"[DEBUG] Kandidat '{cand}' dibuang karena berada di baris NPWP/NITKU."
+                )
+            else:
                 valid_candidates.append(cand)
 
     print(f"[DEBUG] Kandidat yang valid setelah disaring: {valid_candidates}")
@@ -42,14 +40,10 @@ def extract_faktur_tanggal(raw_text):
         )
 
         # Pola ini memperbolehkan huruf di posisi angka untuk menemukan kandidat.
-        tolerant_match = re.search(
-            r"0[0-9a-zA-Z]{2}[-.\s]?[0-9a-zA-Z]{3}[-.\s]?[0-9a-zA-Z]{2}[-.\s]?[0-9a-zA-Z]{8,}",
-            raw_text,
-            re.IGNORECASE,
-        )
+        tolerant_match = all_candidates[0] if all_candidates else None
 
         if tolerant_match:
-            candidate_str = tolerant_match.group(0)
+            candidate_str = tolerant_match
             print(f"[DEBUG] Kandidat faktur (toleran): {candidate_str}")
 
             # Normalisasi: Ganti huruf yang salah baca menjadi angka
@@ -104,44 +98,22 @@ def extract_faktur_tanggal(raw_text):
 
     # --- Ekstraksi Tanggal dengan Beberapa Pola (Fallback Logic) ---
 
-    bulan_list = "Januari|Februari|Maret|April|Mei|Juni|Juli|Agustus|September|Oktober|November|Desember"
-    pola_tanggal_indonesia = rf"(\d{{1,2}})\s+({bulan_list})\s+(\d{{4}})"
-
     # Kita cari semua kandidat tanggal, lalu ambil yang terakhir (biasanya yang paling benar di dekat ttd)
-    matches = re.findall(pola_tanggal_indonesia, raw_text, re.IGNORECASE)
+    matches = doc.kandidat_tanggal
 
     if matches:
         # Ambil temuan terakhir dari daftar
         hari, bulan, tahun = matches[-1]
-        bulan_map = {
-            "januari": "January",
-            "februari": "February",
-            "maret": "March",
-            "april": "April",
-            "mei": "May",
-            "juni": "June",
-            "juli": "July",
-            "agustus": "August",
-            "september": "September",
-            "oktober": "October",
-            "november": "November",
-            "desember": "December",
-        }
-        bulan_inggris = bulan_map.get(bulan.lower())
-        if bulan_inggris:
-            try:
-                tanggal_obj = datetime.strptime(
-                    f"{hari} {bulan_inggris} {tahun}", "%d %B %Y"
-                )
-                print(
-                    f"[DEBUG] Tanggal ditemukan (Pola Indonesia): {tanggal_obj.strftime('%Y-%m-%d')}"
-                )
-            except ValueError:
-                pass
+        tanggal = buat_tanggal(hari, bulan, tahun)
+        if tanggal:
+            tanggal_obj = datetime(tanggal.year, tanggal.month, tanggal.day)
+            print(
+                f"[DEBUG] Tanggal ditemukan (Pola Indonesia): {tanggal_obj.strftime('%Y-%m-%d')}"
+            )
 
     # Pola Fallback lainnya (Tidak ada perubahan)
     if not tanggal_obj:
-        tanggal_match_dmY = re.search(r"(\d{1,2})[/-](\d{1,2})[/-](\d{4})", raw_text)
+        tanggal_match_dmY = doc.tanggal_dmy
         if tanggal_match_dmY:
             try:
                 tanggal_str = tanggal_match_dmY.group(0).replace("/", "-")
@@ -153,7 +125,7 @@ def extract_faktur_tanggal(raw_text):
                 pass
 
     if not tanggal_obj:
-        tanggal_match_Ymd = re.search(r"(\d{4})[/-](\d{1,2})[/-](\d{1,2})", raw_text)
+        tanggal_match_Ymd = doc.tanggal_ymd
         if tanggal_match_Ymd:
             try:
                 tanggal_str = tanggal_match_Ymd.group(0).replace("/", "-")
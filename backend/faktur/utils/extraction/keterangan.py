@@ -1,12 +1,15 @@
 import re
-from shared_utils.text_utils import clean_string
+from .dokumen import DokumenFaktur
+
+POLA_AWAL = re.compile(r"Nama\s+Barang\s+Kena\s+Pajak.*?", re.IGNORECASE)
+POLA_AKHIR = re.compile(r"Dasar\s+Pengenaan\s+Pajak", re.IGNORECASE)
+POLA_NOISE_KARAKTER = re.compile(r"[^\w\s.,:;/\-()Rp]")
 
 def extract_keterangan(raw_text):
     try:
-        start_match = re.search(
-            r"Nama\s+Barang\s+Kena\s+Pajak.*?", raw_text, re.IGNORECASE
-        )
-        end_match = re.search(r"Dasar\s+Pengenaan\s+Pajak", raw_text, re.IGNORECASE)
+        raw_text = DokumenFaktur.dari(raw_text).raw_text
+        start_match = POLA_AWAL.search(raw_text)
+        end_match = POLA_AKHIR.search(raw_text)
 
         if not start_match or not end_match:
             return "Tidak ditemukan"
@@ -51,7 +54,7 @@ def extract_keterangan(raw_text):
             seen_lines.add(line)
 
             # Normalisasi dasar
-            line = re.sub(r"[^\w\s.,:;/\-()Rp]", "", line).strip()
+            line = POLA_NOISE_KARAKTER.sub("", line).strip()
 
             # Koreksi typo
             for typo, correct in typo_map.items():
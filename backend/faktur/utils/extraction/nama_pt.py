@@ -0,0 +1,54 @@
+# utils/extraction/nama_pt.py
+
+from functools import lru_cache
+from rapidfuzz import fuzz
+from shared_utils.text_utils import clean_string
+
+@lru_cache(maxsize=4096)
+def bersihkan(line):
+    """clean_string dengan cache; baris label/header yang berulang antar halaman tidak dibersihkan ulang."""
+    return clean_string(line)
+
+
+class ProfilPT:
+    """Nama PT utama yang sudah dibersihkan, dihitung sekali per nama."""
+
+    def __init__(self, nama_pt):
+        self.teks = clean_string(nama_pt)
+        self.panjang = len(self.teks)
+
+    def mungkin_cocok(self, line_bersih, batas):
+        """
+        False jika baris pasti tidak bisa melewati batas skor fuzz.ratio: baris
+        kosong atau baris yang panjangnya membuat skor maksimal
+        (2·min panjang / total panjang) ≤ batas. Hanya batas matematis skor,
+        bukan isi baris: baris berisi kata label form tetap dinilai karena
+        nama PT bisa memuat kata yang sama ("PAJAK JASA ABC" vs "Pajak Jasa").
+        """
+        if not self.teks:
+            return True
+        panjang = len(line_bersih)
+        return bool(panjang) and 200 * min(self.panjang, panjang) / (self.panjang + panjang) > batas
+
+
+@lru_cache(maxsize=64)
+def profil_pt(nama_pt):
+    return ProfilPT(nama_pt)
+
+
+def cari_baris_cocok(profil, lines, min_skor):
+    """
+    Indeks baris pertama (baris mentah, dibersihkan di sini) yang skor
+    fuzz.ratio-nya terhadap nama PT > min_skor, atau None. Urutan dan hasil
+    sama dengan perbandingan thefuzz per baris; baris yang pasti tidak lolos
+    dilewati tanpa dihitung skornya.
+    """
+    # thefuzz membulatkan skor (round half to even): round(s) > n  ⇔  s > n + 0.5
+    batas = min_skor + 0.5
+    for i, line in enumerate(lines):
+        line_bersih = bersihkan(line)
+        if not profil.mungkin_cocok(line_bersih, batas):
+            continue
+        if fuzz.ratio(profil.teks, line_bersih, score_cutoff=batas) > batas:
+            return i
+    return None
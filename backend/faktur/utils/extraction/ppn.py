@@ -1,5 +1,8 @@
 import re
 from shared_utils.text_utils import clean_number, format_currency
+from .dokumen import DokumenFaktur
+
+POLA_TOTAL_PPN = re.compile(r"Total\s*PPN\s*[:\-]?\s*([\d.,]+)", re.IGNORECASE)
 
 def extract_ppn(raw_text, dpp, override_ppn=None):
     try:
@@ -7,44 +10,40 @@ def extract_ppn(raw_text, dpp, override_ppn=None):
             print(f"[✅ Override PPN] {override_ppn:,.2f}")
             return override_ppn, format_currency(override_ppn)
 
+        doc = DokumenFaktur.dari(raw_text)
         ppn = 0.0
         harga_jual = None
         angka_terdeteksi = []
 
         # Cek 'Total PPN' di seluruh teks (lebih andal)
-        total_ppn_match = re.search(
-            r"Total\s*PPN\s*[:\-]?\s*([\d.,]+)", raw_text, re.IGNORECASE
-        )
+        total_ppn_match = POLA_TOTAL_PPN.search(doc.raw_text)
         if total_ppn_match:
             ppn_val = clean_number(total_ppn_match.group(1))
             print(f"[✅ PPN by 'Total PPN'] {ppn_val:,.2f}")
             return ppn_val, format_currency(ppn_val)
 
-        # Cari di dalam baris-baris relevan
-        lines = raw_text.splitlines()
-        for line in lines:
-            text = line.lower()
-
-            # --- PERUBAHAN DI SINI ---
-            # Tambahkan kondisi untuk mengabaikan baris yang mengandung teks hukum
-            is_legal_text = "pasal" in text or "uu" in text or "keterangan" in text
+        # Mengabaikan baris yang mengandung teks hukum
+        baris_legal = {
+            i for kata in ("pasal", "uu", "keterangan") for i in doc.baris_dengan(kata)
+        }
+        baris_ppn = set(doc.baris_dengan("ppn")) - set(doc.baris_dengan("ppnbm")) - baris_legal
+        baris_harga_jual = set(doc.baris_dengan("harga jual")) | set(doc.baris_dengan("penggantian"))
 
-            if "ppn" in text and "ppnbm" not in text and not is_legal_text:
-                match = re.search(r"([\d.,]+)", line)
-                if match:
-                    ppn = round(clean_number(match.group(1)))
-                    print(f"[✅ PPN by keyword] {ppn:,} ← {line}")
+        # Cari di dalam baris-baris relevan
+        for i in range(len(doc.lines)):
+            numbers = doc.angka(i)
+            if i in baris_ppn:
+                if numbers:
+                    ppn = round(numbers[0][1])
+                    print(f"[✅ PPN by keyword] {ppn:,} ← {doc.lines[i]}")
                     return ppn, format_currency(ppn)
 
             # Heuristik lainnya (tidak ada perubahan)
-            if "harga jual" in text or "penggantian" in text:
-                match = re.search(r"([\d.,]+)", line)
-                if match:
-                    harga_jual = clean_number(match.group(1))
+            if i in baris_harga_jual:
+                if numbers:
+                    harga_jual = numbers[0][1]
 
-            match_all = re.findall(r"([\d.,]{7,})", line)
-            for m in match_all:
-                angka_terdeteksi.append(clean_number(m))
+            angka_terdeteksi.extend(nilai for token, nilai in numbers if len(token) >= 7)
 
         # Fallback jika PPN tidak ditemukan dengan cara di atas
         if harga_jual and dpp and harga_jual > dpp:
@@ -0,0 +1,158 @@
+# utils/layout.py
+
+import re
+import pytesseract
+from pytesseract import Output
+from .ocr_backend import image_to_string
+
+# Label tetap pada form e-Faktur yang dipakai sebagai anchor region
+ANCHORS = {
+    "nomor_seri": re.compile(r"kode\s+dan\s+nomor\s+seri", re.IGNORECASE),
+    "penjual": re.compile(r"pengusaha\s+kena\s+pajak", re.IGNORECASE),
+    "pembeli": re.compile(r"pembeli\s+(?:barang\s+)?kena\s+pajak", re.IGNORECASE),
+    "barang": re.compile(r"nama\s+barang\s+kena\s+pajak", re.IGNORECASE),
+    "dpp": re.compile(r"dasar\s+pengenaan\s+pajak", re.IGNORECASE),
+    "ppn": re.compile(r"total\s*ppn\b", re.IGNORECASE),
+    "tanggal": re.compile(
+        r"\d{1,2}\s+(?:Januari|Februari|Maret|April|Mei|Juni|Juli|Agustus|"
+        r"September|Oktober|November|Desember)\s+\d{4}",
+        re.IGNORECASE,
+    ),
+}
+
+# Setting Tesseract khusus per field
+CONFIG_ANGKA = "--psm 7 -c tessedit_char_whitelist=0123456789.,-"
+CONFIG_BARIS = "--psm 7"
+CONFIG_BLOK = "--psm 6"
+
+PADDING = 6
+
+
+def _baca_baris(img, lang, config):
+    """Jalankan image_to_data sekali dan kelompokkan kata per baris beserta bounding box-nya."""
+    data = pytesseract.image_to_data(img, lang=lang, config=config, output_type=Output.DICT)
+    baris = {}
+    for i, text in enumerate(data["text"]):
+        text = text.strip()
+        if not text or str(data["conf"][i]) == "-1":
+            continue
+        kunci = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        x0, y0 = data["left"][i], data["top"][i]
+        x1, y1 = x0 + data["width"][i], y0 + data["height"][i]
+        baris.setdefault(kunci, []).append((text, x0, y0, x1, y1))
+
+    hasil = []
+    for words in baris.values():
+        hasil.append({
+            "teks": " ".join(w[0] for w in words),
+            "words": words,
+            "x0": min(w[1] for w in words),
+            "y0": min(w[2] for w in words),
+            "x1": max(w[3] for w in words),
+            "y1": max(w[4] for w in words),
+        })
+    # Urutkan dari atas ke bawah supaya teks gabungan mirip image_to_string
+    hasil.sort(key=lambda b: (b["y0"], b["x0"]))
+    return hasil
+
+
+def _cari_anchor(baris):
+    anchor = {}
+    for b in baris:
+        for nama, pola in ANCHORS.items():
+            if not pola.search(b["teks"]):
+                continue
+            # Tanggal diambil dari temuan terakhir (dekat tanda tangan), lainnya yang pertama
+            if nama == "tanggal" or nama not in anchor:
+                anchor[nama] = b
+    return anchor
+
+
+def _x_awal_nilai(b):
+    """Posisi x kata pertama setelah ':' atau kata pertama yang mengandung angka."""
+    words = b["words"]
+    for i, w in enumerate(words[:-1]):
+        if w[0].endswith(":"):
+            return words[i + 1][1]
+    for w in words:
+        if any(ch.isdigit() for ch in w[0]):
+            return w[1]
+    return None
+
+
+def _crop(img, x0, y0, x1, y1):
+    h, w = img.shape[:2]
+    x0, y0 = max(0, x0 - PADDING), max(0, y0 - PADDING)
+    x1, y1 = min(w, x1 + PADDING), min(h, y1 + PADDING)
+    if x1 <= x0 or y1 <= y0:
+        return None
+    return img[y0:y1, x0:x1]
+
+
+def _ocr_nilai_baris(img, b, lang, backend):
+    x_awal = _x_awal_nilai(b)
+    if x_awal is None:
+        return ""
+    crop = _crop(img, x_awal, b["y0"], b["x1"], b["y1"])
+    if crop is None:
+        return ""
+    return image_to_string(crop, lang, CONFIG_ANGKA, backend=backend).strip()
+
+
+def _ocr_blok(img, y_awal, y_akhir, lang, backend):
+    crop = _crop(img, 0, y_awal, img.shape[1], y_akhir)
+    if crop is None:
+        return None
+    return image_to_string(crop, lang, CONFIG_BLOK, backend=backend)
+
+
+def ocr_layout(img, lang, config, backend="pytesseract"):
+    """
+    OCR berbasis layout e-Faktur.
+    image_to_data dijalankan sekali di seluruh halaman untuk teks penuh dan
+    posisi label anchor, lalu hanya region yang dibutuhkan ekstraktor yang
+    di-OCR ulang dengan setting khusus field (whitelist digit untuk angka).
+    Mengembalikan {"raw_text": ..., "roi": {nama_field: teks}}; field yang
+    anchor-nya tidak ditemukan tidak ada di "roi" sehingga caller memakai
+    teks penuh sebagai fallback. image_to_data selalu lewat pytesseract,
+    OCR region memakai `backend` yang dipilih.
+    """
+    baris = _baca_baris(img, lang, config)
+    raw_text = "\n".join(b["teks"] for b in baris)
+    anchor = _cari_anchor(baris)
+    roi = {}
+
+    if "nomor_seri" in anchor:
+        nilai = _ocr_nilai_baris(img, anchor["nomor_seri"], lang, backend)
+        if nilai:
+            roi["nomor_seri"] = f"Kode dan Nomor Seri Faktur Pajak : {nilai}"
+
+    if "dpp" in anchor:
+        nilai = _ocr_nilai_baris(img, anchor["dpp"], lang, backend)
+        if nilai:
+            roi["dpp"] = f"Dasar Pengenaan Pajak {nilai}"
+
+    if "ppn" in anchor:
+        nilai = _ocr_nilai_baris(img, anchor["ppn"], lang, backend)
+        if nilai:
+            roi["ppn"] = f"Total PPN {nilai}"
+
+    if "tanggal" in anchor:
+        b = anchor["tanggal"]
+        crop = _crop(img, b["x0"], b["y0"], b["x1"], b["y1"])
+        if crop is not None:
+            roi["tanggal"] = image_to_string(crop, lang, CONFIG_BARIS, backend=backend)
+
+    if "penjual" in anchor and "pembeli" in anchor:
+        teks = _ocr_blok(img, anchor["penjual"]["y0"], anchor["pembeli"]["y0"], lang, backend)
+        if teks:
+            roi["penjual"] = teks
+
+    batas_bawah = anchor.get("barang") or anchor.get("dpp")
+    if "pembeli" in anchor and batas_bawah:
+        teks = _ocr_blok(img, anchor["pembeli"]["y1"], batas_bawah["y0"], lang, backend)
+        if teks:
+            roi["pembeli"] = teks
+
+    print(f"[🧭 LAYOUT] Anchor: {sorted(anchor)} | ROI: {sorted(roi)}")
+    return {"raw_text": raw_text, "roi": roi}
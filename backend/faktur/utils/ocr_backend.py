@@ -0,0 +1,85 @@
+# utils/ocr_backend.py
+
+import re
+import threading
+import cv2
+import numpy as np
+import pytesseract
+from PIL import Image
+
+try:
+    import tesserocr
+except ImportError:  # opsional, butuh libtesseract di sistem
+    tesserocr = None
+
+BACKENDS = ("pytesseract", "tesserocr")
+
+_local = threading.local()
+
+
+def backend_tersedia(backend):
+    return backend == "pytesseract" or (backend == "tesserocr" and tesserocr is not None)
+
+
+def _parse_config(config):
+    """Ubah string config gaya CLI ('--psm 7 -c key=value') menjadi (psm, variables)."""
+    psm_match = re.search(r"--psm\s+(\d+)", config or "")
+    psm = int(psm_match.group(1)) if psm_match else 3
+    variables = dict(re.findall(r"-c\s+(\w+)=(\S+)", config or ""))
+    return psm, variables
+
+
+def _get_api(lang):
+    """
+    Satu handle PyTessBaseAPI per thread per bahasa. Traineddata dimuat sekali
+    saat handle dibuat lalu dipakai ulang untuk semua halaman berikutnya.
+    """
+    apis = getattr(_local, "apis", None)
+    if apis is None:
+        apis = _local.apis = {}
+    api = apis.get(lang)
+    if api is None:
+        api = tesserocr.PyTessBaseAPI(lang=lang)
+        apis[lang] = api
+    return api
+
+
+def _set_image(api, img):
+    if isinstance(img, Image.Image):
+        api.SetImage(img)
+        return
+
+    arr = np.ascontiguousarray(img)
+    if arr.ndim == 3:
+        arr = np.ascontiguousarray(cv2.cvtColor(arr, cv2.COLOR_BGR2RGB))
+    h, w = arr.shape[:2]
+    bpp = 1 if arr.ndim == 2 else arr.shape[2]
+    # Gambar dikirim langsung dari memori, tanpa file sementara
+    api.SetImageBytes(arr.tobytes(), w, h, bpp, w * bpp)
+
+
+def _tesserocr_to_string(img, lang, config):
+    psm, variables = _parse_config(config)
+    api = _get_api(lang)
+    api.SetPageSegMode(psm)
+    for key, value in variables.items():
+        api.SetVariable(key, value)
+    try:
+        _set_image(api, img)
+        return api.GetUTF8Text()
+    finally:
+        # Variabel per-field (mis. whitelist digit) tidak boleh terbawa ke panggilan berikutnya
+        for key in variables:
+            api.SetVariable(key, "")
+        api.Clear()
+
+
+def image_to_string(img, lang, config, backend="pytesseract"):
+    """
+    Pengganti pytesseract.image_to_string dengan backend yang bisa dipilih.
+    "tesserocr" memakai handle Tesseract yang hidup lama di proses/thread ini;
+    jika paket tesserocr tidak terpasang, otomatis kembali ke pytesseract.
+    """
+    if backend == "tesserocr" and tesserocr is not None:
+        return _tesserocr_to_string(img, lang, config)
+    return pytesseract.image_to_string(img, lang=lang, config=config)
@@ -0,0 +1,26 @@
+# gunicorn.conf.py
+# Dibaca otomatis oleh gunicorn (Procfile: gunicorn app:app) dari folder backend.
+
+import time
+
+_boot_start = time.perf_counter()
+
+
+def when_ready(server):
+    server.log.info(f"[🚀 STARTUP] Master siap dalam {time.perf_counter() - _boot_start:.2f} s")
+
+
+def post_worker_init(worker):
+    """Muat EasyOCR di worker sebelum request pertama jika EASYOCR_PRELOAD=1."""
+    app = worker.wsgi
+    if not app.config.get("EASYOCR_PRELOAD"):
+        return
+
+    from bukti_setor.utils.ocr_engine import get_reader, STARTUP_REPORT
+
+    start = time.perf_counter()
+    get_reader(app.config)
+    worker.log.info(
+        f"[🚀 STARTUP] Worker {worker.pid} preload EasyOCR {time.perf_counter() - start:.2f} s "
+        f"| {STARTUP_REPORT}"
+    )
@@ -0,0 +1,54 @@
+# impor/routes.py
+# ==============================================================================
+# Impor massal faktur / bukti setor dari file CSV atau XLSX: endpoint dan CLI.
+# ==============================================================================
+
+import os
+import uuid
+import click
+from flask import Blueprint, current_app, jsonify, request
+from impor.services import impor_file, TIPE
+
+impor_bp = Blueprint("impor", __name__, url_prefix="/api/import")
+
+EKSTENSI = (".csv", ".xlsx", ".xlsm")
+
+
+# POST /api/import  (multipart: file, tipe=faktur|bukti_setor)
+@impor_bp.route("", methods=["POST"])
+def impor_endpoint():
+    file = request.files.get("file")
+    if not file or not file.filename:
+        return jsonify(error="File tidak ditemukan."), 400
+    if not file.filename.lower().endswith(EKSTENSI):
+        return jsonify(error="Format file harus CSV atau XLSX."), 400
+
+    tipe = request.form.get("tipe") or request.args.get("tipe") or "faktur"
+    if tipe not in TIPE:
+        return jsonify(error=f"Tipe impor harus salah satu dari: {', '.join(TIPE)}."), 400
+
+    ext = os.path.splitext(file.filename)[1].lower()
+    filepath = os.path.join(current_app.config["UPLOAD_FOLDER"], f"impor_{uuid.uuid4().hex}{ext}")
+    file.save(filepath)
+    try:
+        laporan = impor_file(filepath, tipe, current_app.config["IMPORT_CHUNK_SIZE"])
+        return jsonify(laporan), 201 if laporan["saved"] else 200
+    except Exception as e:
+        print(f"[❌ ERROR IMPOR] {e}")
+        return jsonify(error=str(e)), 500
+    finally:
+        os.remove(filepath)
+
+
+# flask impor file data.csv --tipe faktur
+@impor_bp.cli.command("file")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--tipe", type=click.Choice(TIPE), default="faktur", show_default=True)
+@click.option("--chunk", type=int, default=None, help="Baris per commit (default IMPORT_CHUNK_SIZE).")
+def impor_command(path, tipe, chunk):
+    """Impor file CSV/XLSX faktur atau bukti setor, lalu tampilkan ringkasan baris yang ditolak."""
+    laporan = impor_file(path, tipe, chunk or current_app.config["IMPORT_CHUNK_SIZE"])
+    for item in laporan["ditolak"]:
+        click.echo(f"  baris {item['baris']}: [{item['status']}] {item['error']}")
+    if laporan["ditolak_terpotong"]:
+        click.echo(f"  ... (hanya {len(laporan['ditolak'])} baris ditolak pertama yang ditampilkan)")
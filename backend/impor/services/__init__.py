@@ -0,0 +1,3 @@
+# impor/services/__init__.py
+
+from .importer import impor_file, TIPE
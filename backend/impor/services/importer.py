@@ -0,0 +1,260 @@
+# impor/services/importer.py
+
+import io
+import csv
+import time
+from datetime import date, datetime
+from sqlalchemy import insert
+from models import db, PpnMasukan, PpnKeluaran, BuktiSetor
+from faktur.services.file_saver import siapkan_record
+from bukti_setor.services.saver import siapkan_bukti_setor
+from laporan.services import catat_faktur, catat_setor, tambah_ke_ringkasan
+from shared_utils.db_utils import cari_yang_ada, insert_abaikan_duplikat
+from shared_utils.response_cache import naikkan_versi
+
+TIPE = ("faktur", "bukti_setor")
+
+# Baris ditolak yang dicantumkan di laporan; sisanya hanya dihitung
+MAKS_DITOLAK = 1000
+
+# Nama kolom file (setelah dinormalisasi) → field payload /api/save.
+# Termasuk header template export rekap supaya hasil export bisa diimpor ulang.
+ALIAS_KOLOM = {
+    "jenis": "klasifikasi",
+    "jenis_ppn": "klasifikasi",
+    "npwp": "npwp_lawan_transaksi",
+    "npwp_rekanan": "npwp_lawan_transaksi",
+    "nama_rekanan": "nama_lawan_transaksi",
+    "no_faktur": "no_faktur",
+    "nomor_faktur": "no_faktur",
+    "dpp_rupiah": "dpp",
+    "ppn_rupiah": "ppn",
+}
+
+KOLOM_FAKTUR = (
+    "bulan", "tanggal", "keterangan", "npwp_lawan_transaksi",
+    "nama_lawan_transaksi", "no_faktur", "dpp", "ppn",
+)
+KOLOM_BUKTI_SETOR = ("tanggal", "kode_setor", "jumlah")
+
+
+def _nama_kolom(header):
+    nama = "".join(ch if ch.isalnum() else "_" for ch in str(header or "").strip().lower())
+    nama = "_".join(bagian for bagian in nama.split("_") if bagian)
+    return ALIAS_KOLOM.get(nama, nama)
+
+
+def _nilai(value):
+    """Sel XLSX/CSV → string payload: tanggal jadi YYYY-MM-DD, sel kosong jadi None."""
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if value is None:
+        return None
+    return str(value).strip() or None
+
+
+def _baris(header, row):
+    # Sel kosong dibuang supaya validasi melaporkan "wajib diisi", bukan error tipe
+    hasil = {}
+    for kolom, value in zip(header, row):
+        value = _nilai(value)
+        if kolom and value is not None:
+            hasil[kolom] = value
+    return hasil
+
+
+def baca_baris(path):
+    """Generator (nomor_baris, dict) dari CSV atau XLSX; baris pertama adalah header."""
+    if path.lower().endswith((".xlsx", ".xlsm")):
+        from openpyxl import load_workbook
+
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = wb.active.iter_rows(values_only=True)
+            header = [_nama_kolom(h) for h in next(rows, ())]
+            for nomor, row in enumerate(rows, start=2):
+                if any(cell not in (None, "") for cell in row):
+                    yield nomor, _baris(header, row)
+        finally:
+            wb.close()
+        return
+
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        contoh = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(contoh, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        reader = csv.reader(f, dialect)
+        header = [_nama_kolom(h) for h in next(reader, [])]
+        for nomor, row in enumerate(reader, start=2):
+            if any(cell.strip() for cell in row):
+                yield nomor, _baris(header, row)
+
+
+def _klasifikasi(nilai):
+    """'PPN MASUKAN' / 'masukan' / 'PPN_MASUKAN' → 'PPN_MASUKAN' (begitu juga keluaran)."""
+    teks = str(nilai or "").upper()
+    if "MASUKAN" in teks:
+        return "PPN_MASUKAN"
+    if "KELUARAN" in teks:
+        return "PPN_KELUARAN"
+    return nilai
+
+
+def _copy_merge(model, kolom, rows, kunci_unik=None):
+    """
+    PostgreSQL: COPY rows ke tabel staging sementara lalu satu INSERT ... SELECT
+    ke tabel tujuan (ON CONFLICT DO NOTHING pada kunci_unik). Mengembalikan
+    himpunan kunci_unik yang ter-insert, atau None jika tanpa kunci_unik.
+    """
+    tabel = model.__tablename__
+    staging = f"impor_{tabel}"
+    daftar = ", ".join(kolom)
+
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in rows:
+        writer.writerow(["\\N" if row[k] is None else row[k] for k in kolom])
+    buf.seek(0)
+
+    # COPY butuh cursor psycopg2 langsung, di koneksi yang sama dengan session
+    cur = db.session.connection().connection.cursor()
+    try:
+        cur.execute(f"CREATE TEMP TABLE IF NOT EXISTS {staging} AS SELECT {daftar} FROM {tabel} WITH NO DATA")
+        cur.execute(f"TRUNCATE {staging}")
+        cur.copy_expert(f"COPY {staging} ({daftar}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buf)
+        # created_at default-nya dari SQLAlchemy (bukan server default), jadi diisi di sini
+        sql = f"INSERT INTO {tabel} ({daftar}, created_at) SELECT {daftar}, CURRENT_TIMESTAMP FROM {staging}"
+        if kunci_unik:
+            cur.execute(f"{sql} ON CONFLICT ({kunci_unik}) DO NOTHING RETURNING {kunci_unik}")
+            return {row[0] for row in cur.fetchall()}
+        cur.execute(sql)
+        return None
+    finally:
+        cur.close()
+
+
+def _muat_faktur(model, entri, pakai_copy):
+    """entri: [(nomor_baris, values)] tanpa duplikat dalam file. Kembalikan no_faktur yang tersimpan."""
+    rows = [values for _, values in entri]
+    if pakai_copy:
+        return _copy_merge(model, KOLOM_FAKTUR, rows, "no_faktur")
+
+    sudah_ada = cari_yang_ada(db, model, "no_faktur", [v["no_faktur"] for v in rows])
+    baru = [v for v in rows if v["no_faktur"] not in sudah_ada]
+    # ON CONFLICT DO NOTHING (SQLite): faktur yang disimpan /api/save di antara
+    # lookup dan insert dilaporkan duplicate, bukan IntegrityError
+    return insert_abaikan_duplikat(db, model, baru, "no_faktur")
+
+
+def _muat_bukti_setor(entri, pakai_copy):
+    rows = [values for _, values in entri]
+    if pakai_copy:
+        _copy_merge(BuktiSetor, KOLOM_BUKTI_SETOR, rows)
+    elif rows:
+        db.session.execute(insert(BuktiSetor), rows)  # executemany
+
+
+def impor_file(path, tipe, chunk_size=5000):
+    """
+    Validasi dan muat semua baris file ke database per chunk (commit per chunk).
+    Faktur divalidasi dengan siapkan_record (aturan /api/save), bukti setor
+    dengan siapkan_bukti_setor. PostgreSQL memakai COPY + merge, database lain
+    executemany. Mengembalikan laporan: jumlah saved/duplicate/invalid,
+    throughput, dan daftar baris yang ditolak.
+    """
+    if tipe not in TIPE:
+        raise ValueError(f"Tipe impor harus salah satu dari: {', '.join(TIPE)}.")
+
+    pakai_copy = db.session.get_bind().dialect.name == "postgresql"
+    laporan = {
+        "tipe": tipe,
+        "metode": "copy" if pakai_copy else "executemany",
+        "total_baris": 0,
+        "saved": 0,
+        "duplicate": 0,
+        "invalid": 0,
+        "ditolak": [],
+        "ditolak_terpotong": False,
+    }
+    terlihat = {PpnMasukan: set(), PpnKeluaran: set()}
+
+    def tolak(nomor, status, error, no_faktur=None):
+        laporan[status] += 1
+        if len(laporan["ditolak"]) >= MAKS_DITOLAK:
+            laporan["ditolak_terpotong"] = True
+            return
+        item = {"baris": nomor, "status": status, "error": error}
+        if no_faktur:
+            item["no_faktur"] = no_faktur
+        laporan["ditolak"].append(item)
+
+    def muat(chunk):
+        deltas = {}
+        tabel = set()
+        if tipe == "bukti_setor":
+            tabel.add(BuktiSetor.__tablename__)
+            _muat_bukti_setor(chunk, pakai_copy)
+            for _, values in chunk:
+                catat_setor(deltas, values["tanggal"], values["jumlah"])
+            laporan["saved"] += len(chunk)
+        else:
+            per_model = {}
+            for nomor, (model, values) in chunk:
+                per_model.setdefault(model, []).append((nomor, values))
+            for model, entri in per_model.items():
+                tabel.add(model.__tablename__)
+                masuk = _muat_faktur(model, entri, pakai_copy)
+                for nomor, values in entri:
+                    if values["no_faktur"] in masuk:
+                        laporan["saved"] += 1
+                        catat_faktur(deltas, model, values["tanggal"], values["dpp"], values["ppn"])
+                    else:
+                        tolak(nomor, "duplicate", f"Faktur '{values['no_faktur']}' sudah ada.", values["no_faktur"])
+        tambah_ke_ringkasan(deltas)
+        db.session.commit()
+        naikkan_versi(*tabel)
+
+    start = time.perf_counter()
+    chunk = []
+    try:
+        for nomor, data in baca_baris(path):
+            laporan["total_baris"] += 1
+            try:
+                if tipe == "bukti_setor":
+                    chunk.append((nomor, siapkan_bukti_setor(data)))
+                else:
+                    if "klasifikasi" in data:
+                        data["klasifikasi"] = _klasifikasi(data["klasifikasi"])
+                    model, values = siapkan_record(data)
+                    if values["no_faktur"] in terlihat[model]:
+                        tolak(nomor, "duplicate", f"Faktur '{values['no_faktur']}' duplikat di dalam file.", values["no_faktur"])
+                        continue
+                    terlihat[model].add(values["no_faktur"])
+                    chunk.append((nomor, (model, values)))
+            except ValueError as ve:
+                tolak(nomor, "invalid", str(ve), data.get("no_faktur"))
+                continue
+
+            if len(chunk) >= chunk_size:
+                muat(chunk)
+                chunk = []
+        if chunk:
+            muat(chunk)
+    except Exception:
+        db.session.rollback()
+        raise
+
+    detik = time.perf_counter() - start
+    laporan["detik"] = round(detik, 3)
+    laporan["baris_per_detik"] = round(laporan["total_baris"] / detik, 1) if detik else None
+    print(
+        f"[✅ IMPOR] {tipe}: {laporan['total_baris']} baris dalam {laporan['detik']} s "
+        f"({laporan['baris_per_detik']} baris/s, {laporan['metode']}) | saved {laporan['saved']}, "
+        f"duplicate {laporan['duplicate']}, invalid {laporan['invalid']}"
+    )
+    return laporan
@@ -0,0 +1,23 @@
+# laporan/routes.py
+# ==============================================================================
+# Ringkasan PPN per bulan: endpoint baca dan perintah CLI rebuild.
+# ==============================================================================
+
+import click
+from flask import Blueprint
+from laporan.services import get_ringkasan, rebuild_ringkasan
+
+ringkasan_bp = Blueprint("ringkasan", __name__, url_prefix="/api/ringkasan")
+
+
+@ringkasan_bp.route("", methods=["GET"])
+def ringkasan_endpoint():
+    return get_ringkasan()
+
+
+# flask ringkasan rebuild
+@ringkasan_bp.cli.command("rebuild")
+def rebuild_command():
+    """Hitung ulang tabel ringkasan_bulanan dari ppn_masukan, ppn_keluaran, dan bukti_setor."""
+    jumlah = rebuild_ringkasan()
+    click.echo(f"[✅ RINGKASAN] {jumlah} bulan dihitung ulang.")
@@ -0,0 +1,9 @@
+# laporan/services/__init__.py
+
+from .ringkasan import (
+    catat_faktur,
+    catat_setor,
+    tambah_ke_ringkasan,
+    rebuild_ringkasan,
+    get_ringkasan,
+)
@@ -0,0 +1,140 @@
+# laporan/services/ringkasan.py
+
+from decimal import Decimal, ROUND_HALF_UP
+from flask import jsonify, request
+from sqlalchemy import func, extract
+from models import db, PpnMasukan, PpnKeluaran, BuktiSetor, RingkasanBulanan
+from shared_utils.db_utils import insert_dialek
+
+KOLOM_AGREGAT = (
+    "masukan_faktur", "masukan_dpp", "masukan_ppn",
+    "keluaran_faktur", "keluaran_dpp", "keluaran_ppn",
+    "setor_bukti", "setor_jumlah",
+)
+PREFIX_JENIS = {PpnMasukan: "masukan", PpnKeluaran: "keluaran"}
+SEN = Decimal("0.01")
+
+
+def _uang(nilai):
+    """Bulatkan ke 2 desimal seperti kolom Numeric(15, 2) sumbernya."""
+    return Decimal(str(nilai)).quantize(SEN, ROUND_HALF_UP)
+
+
+def _delta_kosong():
+    return {kolom: 0 for kolom in KOLOM_AGREGAT}
+
+
+def catat_faktur(deltas, model, tanggal, dpp, ppn, tanda=1):
+    """Tambahkan satu faktur (tanda=-1 untuk hapus) ke dict delta {(tahun, bulan): {kolom: nilai}}."""
+    prefix = PREFIX_JENIS[model]
+    delta = deltas.setdefault((tanggal.year, tanggal.month), _delta_kosong())
+    delta[f"{prefix}_faktur"] += tanda
+    delta[f"{prefix}_dpp"] += tanda * _uang(dpp)
+    delta[f"{prefix}_ppn"] += tanda * _uang(ppn)
+    return deltas
+
+
+def catat_setor(deltas, tanggal, jumlah, tanda=1):
+    delta = deltas.setdefault((tanggal.year, tanggal.month), _delta_kosong())
+    delta["setor_bukti"] += tanda
+    delta["setor_jumlah"] += tanda * _uang(jumlah)
+    return deltas
+
+
+def tambah_ke_ringkasan(deltas):
+    """
+    Terapkan delta ke ringkasan_bulanan dalam transaksi pemanggil (commit oleh
+    pemanggil). PostgreSQL/SQLite: satu upsert atomik per bulan
+    (INSERT ... ON CONFLICT DO UPDATE SET kolom = kolom + delta).
+    """
+    dialect_insert = insert_dialek(db)
+    tabel = RingkasanBulanan.__table__
+    for (tahun, bulan), delta in deltas.items():
+        if not any(delta.values()):
+            continue
+        if dialect_insert is None:
+            row = db.session.get(RingkasanBulanan, (tahun, bulan), with_for_update=True)
+            if row is None:
+                row = RingkasanBulanan(tahun=tahun, bulan=bulan, **_delta_kosong())
+                db.session.add(row)
+            for kolom, nilai in delta.items():
+                setattr(row, kolom, getattr(row, kolom) + nilai)
+            continue
+        stmt = dialect_insert(RingkasanBulanan).values(tahun=tahun, bulan=bulan, **delta)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["tahun", "bulan"],
+            set_={
+                **{kolom: tabel.c[kolom] + stmt.excluded[kolom] for kolom in KOLOM_AGREGAT},
+                "updated_at": func.current_timestamp(),
+            },
+        )
+        db.session.execute(stmt)
+
+
+def rebuild_ringkasan():
+    """Hitung ulang seluruh ringkasan_bulanan dari tabel sumber (GROUP BY tahun, bulan)."""
+    deltas = {}
+
+    def per_bulan(model, *agregat):
+        tahun = extract("year", model.tanggal)
+        bulan = extract("month", model.tanggal)
+        stmt = db.select(tahun, bulan, *agregat).group_by(tahun, bulan)
+        return db.session.execute(stmt).all()
+
+    for model, prefix in PREFIX_JENIS.items():
+        for tahun, bulan, jumlah, dpp, ppn in per_bulan(model, func.count(), func.sum(model.dpp), func.sum(model.ppn)):
+            delta = deltas.setdefault((int(tahun), int(bulan)), _delta_kosong())
+            delta.update({f"{prefix}_faktur": jumlah, f"{prefix}_dpp": dpp or 0, f"{prefix}_ppn": ppn or 0})
+    for tahun, bulan, jumlah, total in per_bulan(BuktiSetor, func.count(), func.sum(BuktiSetor.jumlah)):
+        delta = deltas.setdefault((int(tahun), int(bulan)), _delta_kosong())
+        delta.update({"setor_bukti": jumlah, "setor_jumlah": total or 0})
+
+    db.session.execute(db.delete(RingkasanBulanan))
+    if deltas:
+        db.session.execute(
+            db.insert(RingkasanBulanan),
+            [{"tahun": tahun, "bulan": bulan, **delta} for (tahun, bulan), delta in sorted(deltas.items())],
+        )
+    db.session.commit()
+    return len(deltas)
+
+
+def _serialize(row):
+    masukan_ppn = float(row.masukan_ppn)
+    keluaran_ppn = float(row.keluaran_ppn)
+    setor = float(row.setor_jumlah)
+    return {
+        "tahun": row.tahun,
+        "bulan": row.bulan,
+        "ppn_masukan": {"jumlah_faktur": row.masukan_faktur, "dpp": float(row.masukan_dpp), "ppn": masukan_ppn},
+        "ppn_keluaran": {"jumlah_faktur": row.keluaran_faktur, "dpp": float(row.keluaran_dpp), "ppn": keluaran_ppn},
+        "setor": {"jumlah_bukti": row.setor_bukti, "total": setor},
+        # PPN kurang (lebih) bayar = keluaran - masukan; selisih_setor = setor - kurang bayar
+        "ppn_kurang_bayar": round(keluaran_ppn - masukan_ppn, 2),
+        "selisih_setor": round(setor - (keluaran_ppn - masukan_ppn), 2),
+    }
+
+
+def get_ringkasan():
+    """
+    GET /api/ringkasan?tahun=&bulan= — satu bulan (lookup primary key), satu
+    tahun, atau semua bulan yang punya data, urut periode.
+    """
+    try:
+        tahun = int(request.args["tahun"]) if request.args.get("tahun") else None
+        bulan = int(request.args["bulan"]) if request.args.get("bulan") else None
+    except ValueError:
+        return jsonify(error="Parameter 'tahun' dan 'bulan' harus berupa angka."), 400
+    if bulan is not None and (tahun is None or not 1 <= bulan <= 12):
+        return jsonify(error="Parameter 'bulan' (1-12) harus disertai 'tahun'."), 400
+
+    if bulan is not None:
+        row = db.session.get(RingkasanBulanan, (tahun, bulan))
+        if row is None:
+            row = RingkasanBulanan(tahun=tahun, bulan=bulan, **_delta_kosong())
+        return jsonify(data=_serialize(row)), 200
+
+    stmt = db.select(RingkasanBulanan).order_by(RingkasanBulanan.tahun, RingkasanBulanan.bulan)
+    if tahun is not None:
+        stmt = stmt.where(RingkasanBulanan.tahun == tahun)
+    return jsonify(data=[_serialize(row) for row in db.session.execute(stmt).scalars()]), 200
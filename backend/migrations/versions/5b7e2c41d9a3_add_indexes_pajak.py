@@ -0,0 +1,33 @@
+"""add indexes pajak
+
+Revision ID: 5b7e2c41d9a3
+Revises: af1e60c82bf9
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b7e2c41d9a3'
+down_revision = 'af1e60c82bf9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Riwayat (keyset tanggal, id), filter NPWP, dan laporan per bulan (urut tanggal)
+    for table in ('ppn_masukan', 'ppn_keluaran'):
+        op.create_index(f'ix_{table}_tanggal_id', table, ['tanggal', 'id'], unique=False)
+        op.create_index(f'ix_{table}_npwp_lawan_transaksi', table, ['npwp_lawan_transaksi'], unique=False)
+        op.create_index(f'ix_{table}_bulan_tanggal', table, ['bulan', 'tanggal', 'id'], unique=False)
+    op.create_index('ix_bukti_setor_tanggal_id', 'bukti_setor', ['tanggal', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_bukti_setor_tanggal_id', table_name='bukti_setor')
+    for table in ('ppn_keluaran', 'ppn_masukan'):
+        op.drop_index(f'ix_{table}_bulan_tanggal', table_name=table)
+        op.drop_index(f'ix_{table}_npwp_lawan_transaksi', table_name=table)
+        op.drop_index(f'ix_{table}_tanggal_id', table_name=table)
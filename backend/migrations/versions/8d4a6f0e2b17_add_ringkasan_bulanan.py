@@ -0,0 +1,84 @@
+"""add ringkasan bulanan
+
+Revision ID: 8d4a6f0e2b17
+Revises: 5b7e2c41d9a3
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d4a6f0e2b17'
+down_revision = '5b7e2c41d9a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('ringkasan_bulanan',
+    sa.Column('tahun', sa.Integer(), nullable=False),
+    sa.Column('bulan', sa.Integer(), nullable=False),
+    sa.Column('masukan_faktur', sa.Integer(), nullable=False),
+    sa.Column('masukan_dpp', sa.Numeric(precision=18, scale=2), nullable=False),
+    sa.Column('masukan_ppn', sa.Numeric(precision=18, scale=2), nullable=False),
+    sa.Column('keluaran_faktur', sa.Integer(), nullable=False),
+    sa.Column('keluaran_dpp', sa.Numeric(precision=18, scale=2), nullable=False),
+    sa.Column('keluaran_ppn', sa.Numeric(precision=18, scale=2), nullable=False),
+    sa.Column('setor_bukti', sa.Integer(), nullable=False),
+    sa.Column('setor_jumlah', sa.Numeric(precision=18, scale=2), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('tahun', 'bulan')
+    )
+    _isi_awal()
+
+
+KOLOM_AGREGAT = (
+    'masukan_faktur', 'masukan_dpp', 'masukan_ppn',
+    'keluaran_faktur', 'keluaran_dpp', 'keluaran_ppn',
+    'setor_bukti', 'setor_jumlah',
+)
+
+
+def _isi_awal():
+    """
+    Isi ringkasan_bulanan dari data yang sudah ada: satu INSERT ... SELECT
+    GROUP BY tahun, bulan atas UNION ALL agregat faktur dan bukti setor,
+    supaya delta inkremental berikutnya tidak ditambahkan ke nol.
+    """
+    def per_bulan(nama_tabel, kolom_nilai, kolom_hasil):
+        tabel = sa.table(nama_tabel, sa.column('tanggal', sa.Date), *(sa.column(k) for k in kolom_nilai))
+        tahun = sa.extract('year', tabel.c.tanggal)
+        bulan = sa.extract('month', tabel.c.tanggal)
+        agregat = {kolom_hasil[0]: sa.func.count()}
+        for nilai, hasil in zip(kolom_nilai, kolom_hasil[1:]):
+            agregat[hasil] = sa.func.coalesce(sa.func.sum(tabel.c[nilai]), 0)
+        kolom = [tahun.label('tahun'), bulan.label('bulan')]
+        for nama in KOLOM_AGREGAT:
+            kolom.append((agregat[nama] if nama in agregat else sa.literal(0)).label(nama))
+        return sa.select(*kolom).group_by(tahun, bulan)
+
+    gabungan = sa.union_all(
+        per_bulan('ppn_masukan', ('dpp', 'ppn'), ('masukan_faktur', 'masukan_dpp', 'masukan_ppn')),
+        per_bulan('ppn_keluaran', ('dpp', 'ppn'), ('keluaran_faktur', 'keluaran_dpp', 'keluaran_ppn')),
+        per_bulan('bukti_setor', ('jumlah',), ('setor_bukti', 'setor_jumlah')),
+    ).subquery()
+
+    ringkasan = sa.table(
+        'ringkasan_bulanan',
+        *(sa.column(k) for k in ('tahun', 'bulan') + KOLOM_AGREGAT + ('updated_at',)),
+    )
+    select = sa.select(
+        gabungan.c.tahun,
+        gabungan.c.bulan,
+        *(sa.func.sum(gabungan.c[k]) for k in KOLOM_AGREGAT),
+        sa.func.current_timestamp(),
+    ).group_by(gabungan.c.tahun, gabungan.c.bulan)
+    op.execute(ringkasan.insert().from_select(
+        ['tahun', 'bulan', *KOLOM_AGREGAT, 'updated_at'], select
+    ))
+
+
+def downgrade():
+    op.drop_table('ringkasan_bulanan')
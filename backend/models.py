@@ -6,6 +6,11 @@ db = SQLAlchemy()
 
 class PpnMasukan(db.Model):
     __tablename__ = "ppn_masukan"
+    __table_args__ = (
+        db.Index("ix_ppn_masukan_tanggal_id", "tanggal", "id"),
+        db.Index("ix_ppn_masukan_npwp_lawan_transaksi", "npwp_lawan_transaksi"),
+        db.Index("ix_ppn_masukan_bulan_tanggal", "bulan", "tanggal", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     bulan = db.Column(db.String(20), nullable=False)
@@ -20,6 +25,11 @@ class PpnMasukan(db.Model):
 
 class PpnKeluaran(db.Model):
     __tablename__ = "ppn_keluaran"
+    __table_args__ = (
+        db.Index("ix_ppn_keluaran_tanggal_id", "tanggal", "id"),
+        db.Index("ix_ppn_keluaran_npwp_lawan_transaksi", "npwp_lawan_transaksi"),
+        db.Index("ix_ppn_keluaran_bulan_tanggal", "bulan", "tanggal", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     bulan = db.Column(db.String(20), nullable=False)
@@ -34,8 +44,25 @@ class PpnKeluaran(db.Model):
 
 class BuktiSetor(db.Model):
     __tablename__ = 'bukti_setor'
+    __table_args__ = (db.Index("ix_bukti_setor_tanggal_id", "tanggal", "id"),)
     id = db.Column(db.Integer, primary_key=True)
     tanggal = db.Column(db.Date, nullable=False)
     kode_setor = db.Column(db.String(100), nullable=False)
     jumlah = db.Column(db.Numeric(15, 2), nullable=False)
-    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
\ No newline at end of file
+    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+
+class RingkasanBulanan(db.Model):
+    """Agregat per bulan (dari kolom tanggal), dijaga inkremental saat simpan/hapus."""
+    __tablename__ = "ringkasan_bulanan"
+
+    tahun = db.Column(db.Integer, primary_key=True)
+    bulan = db.Column(db.Integer, primary_key=True)
+    masukan_faktur = db.Column(db.Integer, nullable=False, default=0)
+    masukan_dpp = db.Column(db.Numeric(18, 2), nullable=False, default=0)
+    masukan_ppn = db.Column(db.Numeric(18, 2), nullable=False, default=0)
+    keluaran_faktur = db.Column(db.Integer, nullable=False, default=0)
+    keluaran_dpp = db.Column(db.Numeric(18, 2), nullable=False, default=0)
+    keluaran_ppn = db.Column(db.Numeric(18, 2), nullable=False, default=0)
+    setor_bukti = db.Column(db.Integer, nullable=False, default=0)
+    setor_jumlah = db.Column(db.Numeric(18, 2), nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
@@ -0,0 +1,87 @@
+# shared_utils/date_utils.py
+
+import re
+from datetime import date
+from functools import lru_cache
+from .text_utils import jarak_edit, batas_jarak_mirip
+
+# Leksikon bulan dibangun sekali saat import: nama lengkap Indonesia (termasuk
+# ejaan lama "nopember") dan bahasa Inggris, plus singkatan tiga huruf (dan
+# "agt") yang hanya dipakai untuk kecocokan persis.
+_NAMA_BULAN = {
+    1: ("januari", "january"),
+    2: ("februari", "pebruari", "february"),
+    3: ("maret", "march"),
+    4: ("april",),
+    5: ("mei", "may"),
+    6: ("juni", "june"),
+    7: ("juli", "july"),
+    8: ("agustus", "august"),
+    9: ("september",),
+    10: ("oktober", "october"),
+    11: ("november", "nopember"),
+    12: ("desember", "december"),
+}
+
+# Kandidat fuzzy: nama lengkap saja. Singkatan terlalu pendek, kata biasa
+# seperti "desa" akan mirip "des".
+NAMA_LENGKAP_BULAN = {
+    nama: bulan for bulan, varian in _NAMA_BULAN.items() for nama in varian
+}
+
+LEKSIKON_BULAN = dict(NAMA_LENGKAP_BULAN)
+for _nama, _bulan in NAMA_LENGKAP_BULAN.items():
+    LEKSIKON_BULAN.setdefault(_nama[:3], _bulan)
+LEKSIKON_BULAN["agt"] = 8
+
+POLA_TANGGAL_BULAN = re.compile(r"(\d{1,2})\s+([a-zA-Z]{3,})\.?\s+(\d{4})")
+
+
+@lru_cache(maxsize=1024)
+def cocokkan_bulan(token, fuzzy=True):
+    """
+    Nomor bulan (1-12) untuk token hasil OCR, atau None.
+    Token yang persis ada di leksikon (nama lengkap atau singkatan) langsung
+    dikembalikan; jika tidak dan fuzzy=True, dipilih nama lengkap dengan jarak
+    Levenshtein terkecil selama similarity ternormalisasinya > 0.6
+    (perhitungan jarak berhenti begitu melewati batas).
+    """
+    token = token.lower()
+    bulan = LEKSIKON_BULAN.get(token)
+    if bulan or not fuzzy:
+        return bulan
+
+    terbaik = None
+    for nama, bulan in NAMA_LENGKAP_BULAN.items():
+        batas = batas_jarak_mirip(len(token), len(nama))
+        if terbaik is not None:
+            batas = min(batas, terbaik[0] - 1)
+        # jarak_edit langsung berhenti jika selisih panjang atau baris DP melewati batas
+        jarak = jarak_edit(token, nama, batas, transposisi=False)
+        if jarak <= batas:
+            terbaik = (jarak, bulan)
+            if jarak == 1:
+                break
+    return terbaik[1] if terbaik else None
+
+
+def buat_tanggal(hari, bulan, tahun):
+    """date dari komponen angka/string, atau None jika tidak valid."""
+    try:
+        return date(int(tahun), int(bulan), int(hari))
+    except (TypeError, ValueError):
+        return None
+
+
+def cari_tanggal_bulan(text, fuzzy=True):
+    """
+    Semua tanggal berformat "<hari> <nama bulan> <tahun>" di text, urut sesuai
+    kemunculan, sebagai list (hari, bulan, tahun) berupa int. Nama bulan yang
+    tidak bisa dicocokkan dilewati.
+    """
+    hasil = []
+    for hari, nama_bulan, tahun in POLA_TANGGAL_BULAN.findall(text):
+        bulan = cocokkan_bulan(nama_bulan, fuzzy)
+        if bulan:
+            hasil.append((int(hari), bulan, int(tahun)))
+    return hasil
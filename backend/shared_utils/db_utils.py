@@ -0,0 +1,201 @@
+# shared_utils/db_utils.py
+
+import json
+import base64
+from datetime import date, datetime, timedelta
+from sqlalchemy import insert
+
+# Batas jumlah parameter per statement (SQLite < 3.32: 999 variabel)
+MAKS_PARAMETER = 999
+
+# Jumlah nilai per query IN (satu parameter per nilai, di bawah MAKS_PARAMETER)
+UKURAN_CHUNK = 500
+
+
+def chunks(items, size=UKURAN_CHUNK):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def cari_yang_ada(db, model, kolom, nilai):
+    """Himpunan nilai kolom yang sudah ada di tabel, satu query IN per chunk."""
+    col = getattr(model, kolom)
+    ada = set()
+    for bagian in chunks(list(set(nilai))):
+        ada.update(db.session.execute(db.select(col).where(col.in_(bagian))).scalars())
+    return ada
+
+
+def insert_dialek(db):
+    """insert() khusus dialek yang punya ON CONFLICT (PostgreSQL/SQLite), atau None."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        dialect_insert = None
+    return dialect_insert
+
+
+def insert_abaikan_duplikat(db, model, rows, kolom_unik):
+    """
+    Bulk insert rows (list of dict) ke tabel model. Di PostgreSQL dan SQLite
+    baris yang bentrok di kolom_unik dilewati (ON CONFLICT DO NOTHING) tanpa
+    menggagalkan baris lain. Mengembalikan himpunan nilai kolom_unik yang
+    benar-benar ter-insert.
+    """
+    if not rows:
+        return set()
+
+    dialect_insert = insert_dialek(db)
+    col = getattr(model, kolom_unik)
+    # INSERT multi-VALUES memakai satu parameter per kolom per baris (termasuk
+    # default sisi Python seperti created_at), jadi chunk diukur per kolom tabel
+    ukuran = max(1, MAKS_PARAMETER // len(model.__table__.columns))
+    masuk = set()
+    for bagian in chunks(rows, ukuran):
+        if dialect_insert is None:
+            # Dialek lain: duplikat sudah disaring lewat cari_yang_ada oleh pemanggil
+            db.session.execute(insert(model), bagian)
+            masuk.update(row[kolom_unik] for row in bagian)
+            continue
+        stmt = (
+            dialect_insert(model)
+            .values(bagian)
+            .on_conflict_do_nothing(index_elements=[kolom_unik])
+            .returning(col)
+        )
+        masuk.update(db.session.execute(stmt).scalars())
+    return masuk
+
+
+# ---------- Keyset pagination ----------
+LIMIT_DEFAULT = 50
+LIMIT_MAKS = 200
+
+
+def parse_limit(nilai):
+    """Parameter ?limit= → int di antara 1..LIMIT_MAKS. ValueError jika bukan angka."""
+    if nilai in (None, ""):
+        return LIMIT_DEFAULT
+    try:
+        limit = int(nilai)
+    except ValueError:
+        raise ValueError("Parameter 'limit' harus berupa angka.")
+    return max(1, min(limit, LIMIT_MAKS))
+
+
+def parse_tanggal_param(nilai, nama):
+    """Parameter tanggal YYYY-MM-DD → date, atau None jika kosong."""
+    if nilai is None or nilai == "":
+        return None
+    # Dari body JSON bisa berupa angka/list, bukan string
+    if not isinstance(nilai, str):
+        raise ValueError(f"Format '{nama}' tidak valid. Gunakan YYYY-MM-DD.")
+    try:
+        return datetime.strptime(nilai, "%Y-%m-%d").date()
+    except ValueError:
+        raise ValueError(f"Format '{nama}' tidak valid. Gunakan YYYY-MM-DD.")
+
+
+def encode_cursor(*nilai):
+    """Cursor opaque (base64 JSON) dari nilai kunci urutan baris terakhir."""
+    raw = json.dumps([v.isoformat() if isinstance(v, date) else v for v in nilai])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, jumlah):
+    """
+    Kebalikan encode_cursor: [tanggal, (teks...,) id]. Elemen pertama
+    dikembalikan sebagai date, elemen tengah harus string, elemen terakhir
+    id integer; cursor palsu → ValueError, bukan error database.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        nilai = json.loads(raw)
+        if not isinstance(nilai, list) or len(nilai) != jumlah:
+            raise ValueError
+        if not all(isinstance(v, str) for v in nilai[1:-1]):
+            raise ValueError
+        if not isinstance(nilai[-1], int) or isinstance(nilai[-1], bool):
+            raise ValueError
+        nilai[0] = date.fromisoformat(nilai[0])
+        return nilai
+    except (ValueError, TypeError):
+        raise ValueError("Parameter 'cursor' tidak valid.")
+
+
+# ---------- Hapus massal ----------
+def parse_ids(nilai):
+    """Payload 'ids' → list id unik, atau None jika tidak dikirim."""
+    if nilai is None:
+        return None
+    if not isinstance(nilai, list) or not nilai or not all(
+        isinstance(i, int) and not isinstance(i, bool) for i in nilai
+    ):
+        raise ValueError("Parameter 'ids' harus berupa list id (angka).")
+    return list(set(nilai))
+
+
+def parse_periode(data):
+    """
+    Filter masa pajak dari payload/query string: tahun (+ bulan 1-12) dan/atau
+    dari/sampai (YYYY-MM-DD). Mengembalikan (dari, sampai) inklusif, masing-
+    masing date atau None; ValueError jika tidak valid.
+    """
+    dari = parse_tanggal_param(data.get("dari"), "dari")
+    sampai = parse_tanggal_param(data.get("sampai"), "sampai")
+
+    tahun, bulan = data.get("tahun"), data.get("bulan")
+    if bulan not in (None, "") and tahun in (None, ""):
+        raise ValueError("Parameter 'bulan' (1-12) harus disertai 'tahun'.")
+    if tahun not in (None, ""):
+        try:
+            tahun = int(tahun)
+            bulan = int(bulan) if bulan not in (None, "") else None
+            if bulan is not None and not 1 <= bulan <= 12:
+                raise ValueError
+            awal = date(tahun, bulan or 1, 1)
+            if bulan is None or bulan == 12:
+                akhir = date(tahun, 12, 31)
+            else:
+                akhir = date(tahun, bulan + 1, 1) - timedelta(days=1)
+        except (ValueError, TypeError):
+            raise ValueError("Parameter 'tahun' dan 'bulan' (1-12) harus berupa angka.")
+        dari = max(dari, awal) if dari else awal
+        sampai = min(sampai, akhir) if sampai else akhir
+    return dari, sampai
+
+
+def kondisi_rentang(kolom, dari, sampai):
+    """List kondisi SQL kolom tanggal di antara dari..sampai (None = tanpa batas)."""
+    kondisi = []
+    if dari:
+        kondisi.append(kolom >= dari)
+    if sampai:
+        kondisi.append(kolom <= sampai)
+    return kondisi
+
+
+def kondisi_periode(kolom, data):
+    """
+    parse_periode(data) sebagai list kondisi SQL atas kolom tanggal; berupa
+    range tanggal supaya index tanggal tetap terpakai.
+    """
+    return kondisi_rentang(kolom, *parse_periode(data))
+
+
+def hapus_returning(db, model, kondisi, *kolom):
+    """
+    Satu DELETE set-based (WHERE kondisi) dalam transaksi pemanggil.
+    Mengembalikan baris kolom dari data yang terhapus — lewat DELETE ...
+    RETURNING bila dialek mendukung, selain itu SELECT dengan kondisi yang
+    sama sebelum DELETE.
+    """
+    if db.session.get_bind().dialect.delete_returning:
+        stmt = db.delete(model).where(kondisi).returning(*kolom)
+        return db.session.execute(stmt, execution_options={"synchronize_session": False}).all()
+    rows = db.session.execute(db.select(*kolom).where(kondisi).with_for_update()).all()
+    db.session.execute(db.delete(model).where(kondisi), execution_options={"synchronize_session": False})
+    return rows
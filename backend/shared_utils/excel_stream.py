@@ -0,0 +1,108 @@
+# shared_utils/excel_stream.py
+
+import os
+from copy import copy
+from functools import lru_cache
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Side
+
+THIN = Side(style="thin")
+BORDER_DATA = Border(left=THIN, right=THIN, top=THIN, bottom=THIN)
+ALIGN_DATA = Alignment(vertical="center")
+FORMAT_ANGKA = "#,##0.00"
+
+
+@lru_cache(maxsize=8)
+def _baca_template(path, mtime):
+    """Judul sheet, sel header (nilai + style), lebar kolom, dan font default template."""
+    wb = load_workbook(path)
+    ws = wb.active
+    header = [
+        (c.value, copy(c.font), copy(c.fill), copy(c.border), copy(c.alignment), c.number_format)
+        if c.has_style else (c.value, None, None, None, None, None)
+        for c in ws[1]
+    ]
+    lebar = {kolom: dim.width for kolom, dim in ws.column_dimensions.items() if dim.width}
+    # Sel kosong di bawah header memakai style Normal workbook (font default template)
+    font_default = copy(ws.cell(row=ws.max_row + 1, column=1).font)
+    return ws.title, header, lebar, font_default, ws.freeze_panes
+
+
+def baca_template(path):
+    return _baca_template(path, os.path.getmtime(path))
+
+
+def tambah_sheet(wb, template_path, rows, kolom_angka=(), judul=None):
+    """
+    Tambahkan satu sheet berisi rows (iterable list nilai) ke workbook
+    write-only: baris dikirim ke disk saat ditulis sehingga memori tidak
+    bergantung pada jumlah baris. Header, lebar kolom, dan font diambil dari
+    template; style sel data (border tipis, rata tengah vertikal, format
+    angka untuk kolom_angka berbasis 1) dibuat sekali per kolom. Jumlah
+    kolom rows tidak boleh melebihi kolom header template.
+    """
+    judul_template, header, lebar, font_default, freeze = baca_template(template_path)
+
+    ws = wb.create_sheet(judul or judul_template)
+    for kolom, width in lebar.items():
+        ws.column_dimensions[kolom].width = width
+    if freeze:
+        ws.freeze_panes = freeze
+
+    sel_header = []
+    for value, font, fill, border, alignment, number_format in header:
+        cell = WriteOnlyCell(ws, value=value)
+        if font is not None:
+            cell.font, cell.fill, cell.border = font, fill, border
+            cell.alignment, cell.number_format = alignment, number_format
+        sel_header.append(cell)
+    ws.append(sel_header)
+
+    # Satu sel per kolom dengan style yang sudah terpasang, dipakai ulang untuk
+    # setiap baris: append() langsung menulis baris ke disk, jadi hanya nilai
+    # yang perlu diganti dan style tidak di-hash ulang per sel
+    sel = []
+    for kolom in range(1, len(header) + 1):
+        cell = WriteOnlyCell(ws)
+        cell.font, cell.border, cell.alignment = font_default, BORDER_DATA, ALIGN_DATA
+        if kolom in kolom_angka:
+            cell.number_format = FORMAT_ANGKA
+        sel.append(cell)
+
+    jumlah = 0
+    for row in rows:
+        cells = sel[:len(row)]
+        for cell, value in zip(cells, row):
+            cell.value = value
+        ws.append(cells)
+        jumlah += 1
+    return jumlah
+
+
+def tulis_excel_stream(path, template_path, rows, kolom_angka=()):
+    """Workbook write-only satu sheet (lihat tambah_sheet) disimpan ke path."""
+    wb = Workbook(write_only=True)
+    jumlah = tambah_sheet(wb, template_path, rows, kolom_angka)
+    wb.save(path)
+    return jumlah
+
+
+def tulis_excel_template(path, template_path, rows, kolom_angka=()):
+    """Isi template sel per sel mulai baris 2; seluruh workbook ada di memori sampai disimpan."""
+    wb = load_workbook(template_path)
+    ws = wb.active
+
+    start_row = 2  # Baris 1 header template
+    jumlah = 0
+    for idx, row_data in enumerate(rows, start=start_row):
+        for col_index, value in enumerate(row_data, start=1):
+            cell = ws.cell(row=idx, column=col_index, value=value)
+            cell.alignment = ALIGN_DATA
+            cell.border = BORDER_DATA
+            if isinstance(value, (int, float)) and col_index in kolom_angka:
+                cell.number_format = FORMAT_ANGKA
+        jumlah += 1
+
+    wb.save(path)
+    return jumlah
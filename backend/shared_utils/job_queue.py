@@ -0,0 +1,202 @@
+# shared_utils/job_queue.py
+
+import os
+import json
+import time
+import uuid
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+
+
+class JobQueue:
+    """
+    Antrean job lokal tanpa broker eksternal.
+    Job dijalankan di ThreadPoolExecutor milik proses ini, sedangkan status
+    ditulis ke UPLOAD_FOLDER/jobs/<job_id>.json dan hasil per halaman
+    di-append ke <job_id>.halaman.jsonl (satu baris per halaman, tanpa
+    menulis ulang halaman sebelumnya) sehingga bisa di-poll dari worker
+    gunicorn mana pun di mesin yang sama. TTL dihitung sejak job selesai.
+    Job yang belum selesai melewati batas_waktu (max_runtime sejak submit,
+    termasuk waktu antre) dianggap gagal karena workernya mati/restart, lalu
+    dihapus setelah TTL bersama file input-nya.
+    """
+
+    def __init__(self, app, folder, workers, ttl_seconds, max_runtime_seconds):
+        self.app = app
+        self.folder = folder
+        self.ttl_seconds = ttl_seconds
+        self.max_runtime_seconds = max_runtime_seconds
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr-job")
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+        os.makedirs(self.folder, exist_ok=True)
+
+    def _path(self, job_id):
+        return os.path.join(self.folder, f"{job_id}.json")
+
+    def _path_halaman(self, job_id):
+        return os.path.join(self.folder, f"{job_id}.halaman.jsonl")
+
+    def _tulis(self, record):
+        path = self._path(record["job_id"])
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def submit(self, jenis, fn, *args, file_input=None, **kwargs):
+        """
+        Daftarkan job baru dan jalankan fn(*args, on_halaman=callback, **kwargs)
+        di background. file_input (upload yang diproses job) ikut dihapus saat
+        record job yang tidak selesai dibersihkan. Mengembalikan job_id.
+        """
+        self.purge_expired()
+        now = time.time()
+        record = {
+            "job_id": uuid.uuid4().hex,
+            "jenis": jenis,
+            "status": "queued",
+            "created_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "expires_at": None,  # diisi saat job selesai
+            "batas_waktu": now + self.max_runtime_seconds,
+            "file_input": file_input,
+            "result": None,
+            "error": None,
+        }
+        self._tulis(record)
+        self.executor.submit(self._run, record, fn, args, kwargs)
+        return record["job_id"]
+
+    def _run(self, record, fn, args, kwargs):
+        lock = threading.Lock()
+        path_halaman = self._path_halaman(record["job_id"])
+
+        def on_halaman(hasil_halaman):
+            baris = json.dumps(hasil_halaman, ensure_ascii=False) + "\n"
+            with lock, open(path_halaman, "a", encoding="utf-8") as f:
+                f.write(baris)
+
+        record["status"] = "running"
+        record["started_at"] = time.time()
+        self._tulis(record)
+
+        with self.app.app_context():
+            try:
+                record["result"] = _tanpa_hasil_halaman(fn(*args, on_halaman=on_halaman, **kwargs))
+                record["status"] = "done"
+            except Exception as e:
+                current_app.logger.error(f"[❌ JOB {record['job_id']}] {e}\n{traceback.format_exc()}")
+                record["status"] = "failed"
+                record["error"] = str(e)
+
+        with lock:
+            record["finished_at"] = time.time()
+            record["expires_at"] = record["finished_at"] + self.ttl_seconds
+            self._tulis(record)
+
+    def _baca_halaman(self, job_id):
+        results = []
+        try:
+            with open(self._path_halaman(job_id), "r", encoding="utf-8") as f:
+                for baris in f:
+                    try:
+                        results.append(json.loads(baris))
+                    except ValueError:
+                        break  # baris terakhir yang sedang ditulis
+        except OSError:
+            pass
+        return results
+
+    def get(self, job_id):
+        """Record job + results (hasil per halaman sejauh ini), atau None jika tidak ada/kedaluwarsa."""
+        self.purge_expired()
+        try:
+            with open(self._path(job_id), "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        now = time.time()
+        if _kedaluwarsa(record, now, self.ttl_seconds):
+            return None
+        if _basi(record, now):
+            record["status"] = "failed"
+            record["error"] = "Job tidak selesai dalam batas waktu (worker berhenti atau restart)."
+        record["results"] = self._baca_halaman(job_id)
+        record["halaman_selesai"] = len(record["results"])
+        return record
+
+    def purge_expired(self, min_interval=60):
+        now = time.time()
+        with self._lock:
+            if now - self._last_purge < min_interval:
+                return
+            self._last_purge = now
+
+        for name in os.listdir(self.folder):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.folder, name)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    record = json.load(f)
+                if not _kedaluwarsa(record, now, self.ttl_seconds):
+                    continue
+                os.remove(path)
+                sisa = [self._path_halaman(name[:-len(".json")])]
+                if _basi(record, now) and record.get("file_input"):
+                    # Job normal menghapus file input-nya sendiri di finally
+                    sisa.append(record["file_input"])
+                for path_sisa in sisa:
+                    if os.path.exists(path_sisa):
+                        os.remove(path_sisa)
+            except (OSError, ValueError):
+                continue
+
+
+def _basi(record, now):
+    """Job masih antre/berjalan padahal batas_waktu sudah lewat."""
+    batas_waktu = record.get("batas_waktu")
+    return record.get("expires_at") is None and batas_waktu is not None and batas_waktu < now
+
+
+def _kedaluwarsa(record, now, ttl_seconds):
+    # expires_at None: job belum selesai, kedaluwarsa TTL detik setelah batas_waktu
+    expires_at = record.get("expires_at")
+    if expires_at is None:
+        batas_waktu = record.get("batas_waktu")
+        expires_at = batas_waktu + ttl_seconds if batas_waktu is not None else None
+    return expires_at is not None and expires_at < now
+
+
+def _tanpa_hasil_halaman(result):
+    """
+    Nilai kembali fn tanpa daftar hasil per halaman, yang sudah tersimpan di
+    file .halaman.jsonl: key "results" dibuang dari dict, list (bukti setor)
+    jadi None.
+    """
+    if isinstance(result, dict):
+        return {k: v for k, v in result.items() if k != "results"}
+    if isinstance(result, list):
+        return None
+    return result
+
+
+def init_job_queue(app):
+    folder = os.path.join(app.config["UPLOAD_FOLDER"], "jobs")
+    queue = JobQueue(
+        app,
+        folder,
+        workers=int(app.config.get("JOB_WORKERS", 2)),
+        ttl_seconds=int(app.config.get("JOB_TTL_SECONDS", 3600)),
+        max_runtime_seconds=int(app.config.get("JOB_MAX_RUNTIME_SECONDS", 7200)),
+    )
+    app.extensions["job_queue"] = queue
+    return queue
+
+
+def get_job_queue():
+    return current_app.extensions["job_queue"]
@@ -0,0 +1,80 @@
+# shared_utils/pdf_utils.py
+
+import os
+import re
+import subprocess
+from pdf2image import convert_from_path, pdfinfo_from_path
+
+
+def opsi_rasterisasi(config):
+    """Ambil opsi rasterisasi PDF dari config Flask (dict-like)."""
+    return {
+        "dpi": int(config.get("PDF_DPI", 200)),
+        "grayscale": bool(config.get("PDF_GRAYSCALE", False)),
+        "thread_count": int(config.get("PDF_THREAD_COUNT", 1)),
+        "window": int(config.get("PDF_WINDOW", 1)),
+    }
+
+
+def hitung_halaman_pdf(filepath, poppler_path=None):
+    info = pdfinfo_from_path(filepath, poppler_path=poppler_path)
+    return int(info["Pages"])
+
+
+def iter_halaman_pdf(filepath, poppler_path=None, dpi=200, grayscale=False,
+                     thread_count=1, window=1, total_halaman=None):
+    """
+    Generator (nomor_halaman, PIL.Image) yang merender PDF per jendela kecil
+    (`window` halaman sekaligus) alih-alih seluruh dokumen, sehingga memori
+    puncak tidak bergantung pada jumlah halaman.
+    """
+    if total_halaman is None:
+        total_halaman = hitung_halaman_pdf(filepath, poppler_path)
+    window = max(1, window)
+
+    for awal in range(1, total_halaman + 1, window):
+        akhir = min(awal + window - 1, total_halaman)
+        pages = convert_from_path(
+            filepath,
+            dpi=dpi,
+            first_page=awal,
+            last_page=akhir,
+            grayscale=grayscale,
+            thread_count=thread_count,
+            poppler_path=poppler_path,
+        )
+        for offset, page in enumerate(pages):
+            yield awal + offset, page
+        del pages
+
+
+def ekstrak_text_layer(filepath, poppler_path=None, timeout=60):
+    """
+    Ambil text layer bawaan PDF (mis. e-Faktur hasil aplikasi DJP) dengan
+    pdftotext dari poppler dalam satu panggilan. Mengembalikan list teks per
+    halaman (indeks 0 = halaman 1), atau list kosong jika pdftotext gagal.
+    """
+    pdftotext = os.path.join(poppler_path, "pdftotext") if poppler_path else "pdftotext"
+    try:
+        proc = subprocess.run(
+            [pdftotext, "-layout", "-enc", "UTF-8", filepath, "-"],
+            capture_output=True,
+            timeout=timeout,
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        print(f"[⚠️ TEXT LAYER] pdftotext tidak bisa dijalankan: {e}")
+        return []
+
+    if proc.returncode != 0:
+        return []
+
+    # pdftotext memisahkan halaman dengan form feed
+    pages = proc.stdout.decode("utf-8", errors="replace").split("\f")
+    if pages and not pages[-1].strip():
+        pages.pop()
+    return pages
+
+
+def punya_text_layer(text, min_chars=100):
+    """True jika teks halaman cukup banyak untuk dipakai tanpa OCR."""
+    return bool(text) and len(re.findall(r"[0-9A-Za-z]", text)) >= min_chars
@@ -0,0 +1,217 @@
+# shared_utils/response_cache.py
+
+import os
+import uuid
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from flask import current_app, request, send_file
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+class ResponseCache:
+    """
+    Cache respons GET yang dikunci versi tabel sumbernya.
+    Versi per tabel berupa token acak di UPLOAD_FOLDER/cache/versi/<tabel>,
+    diganti oleh setiap jalur tulis setelah commit, sehingga dibaca sama oleh
+    semua worker gunicorn di mesin yang sama tanpa query ke database.
+    Body JSON disimpan di memori proses (LRU), file export di disk
+    (UPLOAD_FOLDER/cache/export) dan hanya versi terbaru yang dipertahankan.
+    """
+
+    def __init__(self, folder, max_entries):
+        self.folder_versi = os.path.join(folder, "versi")
+        self.folder_export = os.path.join(folder, "export")
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._memori = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(self.folder_versi, exist_ok=True)
+        os.makedirs(self.folder_export, exist_ok=True)
+
+    def _path_versi(self, tabel):
+        return os.path.join(self.folder_versi, tabel)
+
+    def _tulis_versi(self, tabel):
+        path = self._path_versi(tabel)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(uuid.uuid4().hex)
+        os.replace(tmp_path, path)
+
+    def versi(self, *tabel):
+        bagian = []
+        for nama in tabel:
+            try:
+                with open(self._path_versi(nama), "r", encoding="utf-8") as f:
+                    bagian.append(f.read().strip())
+            except OSError:
+                # Belum ada (folder cache baru/terhapus): buat token baru, jangan pakai konstanta
+                self._tulis_versi(nama)
+                return self.versi(*tabel)
+        return "_".join(bagian)
+
+    def naikkan(self, *tabel):
+        for nama in tabel:
+            self._tulis_versi(nama)
+
+    def _catat(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, kunci):
+        with self._lock:
+            entri = self._memori.get(kunci)
+            if entri is not None:
+                self._memori.move_to_end(kunci)
+        self._catat(entri is not None)
+        return entri
+
+    def set(self, kunci, entri):
+        with self._lock:
+            self._memori[kunci] = entri
+            self._memori.move_to_end(kunci)
+            while len(self._memori) > self.max_entries:
+                self._memori.popitem(last=False)
+
+    def path_export(self, nama, versi, kunci):
+        return os.path.join(self.folder_export, f"{nama}-{versi}-{kunci[:16]}.xlsx")
+
+    def buang_export_lama(self, nama, versi):
+        """Hapus file export nama yang dibuat untuk versi tabel sebelumnya."""
+        for file in os.listdir(self.folder_export):
+            if file.startswith(f"{nama}-") and not file.startswith(f"{nama}-{versi}-"):
+                try:
+                    os.remove(os.path.join(self.folder_export, file))
+                except OSError:
+                    pass
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "entries": len(self._memori),
+            }
+
+
+def get_response_cache(config):
+    """Instance ResponseCache per folder upload, atau None jika cache dimatikan."""
+    if not config.get("RESPONSE_CACHE_ENABLED", True):
+        return None
+
+    folder = os.path.join(config["UPLOAD_FOLDER"], "cache")
+    with _instances_lock:
+        cache = _instances.get(folder)
+        if cache is None:
+            cache = ResponseCache(folder, int(config.get("RESPONSE_CACHE_ENTRIES", 256)))
+            _instances[folder] = cache
+        return cache
+
+
+def naikkan_versi(*tabel):
+    """Panggil setelah commit yang mengubah tabel; respons cache lama jadi tidak terpakai."""
+    cache = get_response_cache(current_app.config)
+    if cache:
+        cache.naikkan(*tabel)
+
+
+def _etag(cache, nama, tabel):
+    versi = cache.versi(*tabel)
+    kunci = hashlib.blake2b(f"{nama}|{versi}|{request.full_path}".encode(), digest_size=16).hexdigest()
+    return versi, kunci
+
+
+def _tidak_berubah(kunci):
+    if kunci in request.if_none_match:
+        response = current_app.response_class(status=304)
+        response.set_etag(kunci)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+    return None
+
+
+def respon_cache(nama, tabel, buat_respon):
+    """
+    GET dengan ETag = hash(versi tabel + URL). If-None-Match yang cocok → 304
+    tanpa menyentuh database; selain itu body 200 non-stream disimpan di memori
+    dan dipakai ulang selama versi tabel belum berubah.
+    """
+    cache = get_response_cache(current_app.config)
+    if cache is None:
+        return buat_respon()
+
+    # Versi dibaca sebelum query: data yang di-cache minimal sebaru versi ini
+    _, kunci = _etag(cache, nama, tabel)
+    response = _tidak_berubah(kunci)
+    if response is not None:
+        return response
+
+    entri = cache.get(kunci)
+    if entri is None:
+        response = current_app.make_response(buat_respon())
+        if response.status_code != 200:
+            return response
+        if not response.is_streamed:
+            cache.set(kunci, (response.get_data(), response.mimetype))
+    else:
+        body, mimetype = entri
+        response = current_app.response_class(body, mimetype=mimetype)
+    response.set_etag(kunci)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def export_cache(nama, tabel, tulis_file, download_name):
+    """
+    Export Excel yang di-cache di disk per versi tabel (+ query string).
+    tulis_file(path) membuat workbook di path; file dibuat ulang hanya jika
+    versi tabel sudah berubah sejak export terakhir.
+    """
+    cache = get_response_cache(current_app.config)
+    if cache is None:
+        temp = tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx")
+        temp.close()
+        try:
+            tulis_file(temp.name)
+            response = send_file(temp.name, as_attachment=True, download_name=download_name)
+        except Exception:
+            os.remove(temp.name)
+            raise
+        # File sementara dihapus setelah respons selesai dikirim. Tanpa
+        # direct_passthrough body lewat ClosingIterator, yang menutup file lalu
+        # menjalankan callback call_on_close (dengan passthrough callback dilewati).
+        response.direct_passthrough = False
+        response.call_on_close(lambda: os.remove(temp.name))
+        return response
+
+    versi, kunci = _etag(cache, nama, tabel)
+    response = _tidak_berubah(kunci)
+    if response is not None:
+        return response
+
+    path = cache.path_export(nama, versi, kunci)
+    ada = os.path.exists(path)
+    cache._catat(ada)
+    if not ada:
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            tulis_file(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        cache.buang_export_lama(nama, versi)
+
+    response = send_file(path, as_attachment=True, download_name=download_name, etag=kunci)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
@@ -1,7 +1,7 @@
 # shared_utils/text_utils.py
 
 import re
-import textdistance
+import math
 
 def clean_number(text):
     if not text:
@@ -44,17 +44,51 @@ def clean_transaction_value(value_str):
     except (ValueError, TypeError):
         return None
 
+_BUKAN_HURUF = re.compile(r"[^A-Z\s]")
+# PT, CV, dan UD sudah terbuang oleh filter panjang kata > 2
+_BADAN_USAHA = frozenset({"TBK", "PERSERO", "PERUM"})
+
 def clean_string(text):
     if not text:
         return ""
     if ":" in text:
         text = text.split(":", 1)[1]
-    text = text.upper()
-    text = re.sub(r"[^A-Z\s]", "", text)
-    text = re.sub(r"\b(PT|CV|TBK|PERSERO|PERUM|UD)\b", "", text)
-    words = [w for w in text.split() if len(w) > 2]
-    return " ".join(words).strip()
+    text = _BUKAN_HURUF.sub("", text.upper())
+    return " ".join([w for w in text.split() if len(w) > 2 and w not in _BADAN_USAHA])
+
+def jarak_edit(a, b, batas, transposisi=True):
+    """
+    Jarak edit Damerau-Levenshtein (optimal string alignment) antara a dan b,
+    atau Levenshtein biasa jika transposisi=False (tukar dua huruf bertetangga
+    dihitung 2). Berhenti lebih awal dan mengembalikan batas + 1 begitu
+    jaraknya pasti > batas.
+    """
+    if abs(len(a) - len(b)) > batas:
+        return batas + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            biaya = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + biaya)
+            if transposisi and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > batas:
+            return batas + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+def batas_jarak_mirip(panjang_a, panjang_b, min_similarity=0.6):
+    """Jarak edit maksimal supaya similarity ternormalisasi (1 - jarak/panjang) > min_similarity."""
+    panjang = max(panjang_a, panjang_b)
+    return max(0, math.ceil(round((1 - min_similarity) * panjang, 9)) - 1)
 
 def fuzzy_month_match(input_month, all_months):
-    matches = [m for m in all_months if textdistance.levenshtein.normalized_similarity(input_month.lower(), m.lower()) > 0.6]
-    return matches[0] if matches else None
+    """Bulan pertama di all_months dengan similarity Levenshtein ternormalisasi > 0.6, atau None."""
+    input_month = input_month.lower()
+    for m in all_months:
+        batas = batas_jarak_mirip(len(input_month), len(m))
+        if jarak_edit(input_month, m.lower(), batas, transposisi=False) <= batas:
+            return m
+    return None